@@ -0,0 +1,120 @@
+"""store authors as json and add authors table
+
+Revision ID: a6f2d91c3e58
+Revises: e3b8c27d5a14
+Create Date: 2025-05-24 16:40:03.581214
+
+"""
+import ast
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f2d91c3e58'
+down_revision: Union[str, None] = 'e3b8c27d5a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def _parse_authors(value):
+    """解析舊版以 str(list) 保存的作者字串（以 literal_eval 取代 eval）"""
+    if not value:
+        return []
+    try:
+        authors = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        authors = [value]
+    if isinstance(authors, str):
+        authors = [authors]
+    names = (str(author).strip()[:200] for author in authors if author is not None)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    authors_type = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+    op.create_table('authors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_authors_id'), 'authors', ['id'], unique=False)
+    op.create_index(op.f('ix_authors_name'), 'authors', ['name'], unique=True)
+    op.create_table('paper_author',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['authors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('paper_id', 'author_id')
+    )
+    op.create_index(op.f('ix_paper_author_author_id'), 'paper_author', ['author_id'], unique=False)
+    op.add_column('papers', sa.Column('authors_json', authors_type, nullable=True))
+
+    # 回填：逐批解析舊字串，寫入 JSON 欄位與正規化的作者表
+    conn = op.get_bind()
+    papers = sa.table('papers', sa.column('id', sa.Integer), sa.column('authors', sa.String),
+                      sa.column('authors_json', authors_type))
+    authors = sa.table('authors', sa.column('id', sa.Integer), sa.column('name', sa.String))
+    paper_author = sa.table('paper_author', sa.column('paper_id', sa.Integer),
+                            sa.column('author_id', sa.Integer), sa.column('position', sa.Integer))
+    author_ids = {}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(papers.c.id, papers.c.authors)
+            .where(papers.c.id > last_id).order_by(papers.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        links = []
+        for paper_id, value in rows:
+            names = _parse_authors(value)
+            conn.execute(
+                papers.update().where(papers.c.id == paper_id).values(authors_json=names)
+            )
+            for position, name in enumerate(names):
+                if name not in author_ids:
+                    author_ids[name] = conn.execute(
+                        authors.insert().values(name=name).returning(authors.c.id)
+                    ).scalar_one()
+                links.append({'paper_id': paper_id, 'author_id': author_ids[name], 'position': position})
+        if links:
+            conn.execute(paper_author.insert(), links)
+        last_id = rows[-1][0]
+
+    op.drop_column('papers', 'authors')
+    op.alter_column('papers', 'authors_json', new_column_name='authors', nullable=False,
+                    existing_type=authors_type)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    authors_type = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+    op.add_column('papers', sa.Column('authors_str', sa.VARCHAR(length=500), nullable=True))
+
+    conn = op.get_bind()
+    papers = sa.table('papers', sa.column('id', sa.Integer), sa.column('authors', authors_type),
+                      sa.column('authors_str', sa.String))
+    for paper_id, names in conn.execute(sa.select(papers.c.id, papers.c.authors)).fetchall():
+        if isinstance(names, str):
+            names = json.loads(names)
+        conn.execute(
+            papers.update().where(papers.c.id == paper_id).values(authors_str=str(names or [])[:500])
+        )
+
+    op.drop_column('papers', 'authors')
+    op.alter_column('papers', 'authors_str', new_column_name='authors', nullable=False,
+                    existing_type=sa.VARCHAR(length=500))
+    op.drop_index(op.f('ix_paper_author_author_id'), table_name='paper_author')
+    op.drop_table('paper_author')
+    op.drop_index(op.f('ix_authors_name'), table_name='authors')
+    op.drop_index(op.f('ix_authors_id'), table_name='authors')
+    op.drop_table('authors')
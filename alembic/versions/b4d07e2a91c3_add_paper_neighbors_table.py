@@ -0,0 +1,37 @@
+"""add paper_neighbors table
+
+Revision ID: b4d07e2a91c3
+Revises: f27b0c4d9e18
+Create Date: 2025-05-22 15:03:12.418902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d07e2a91c3'
+down_revision: Union[str, None] = 'f27b0c4d9e18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('paper_neighbors',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('neighbor_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['neighbor_id'], ['papers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('paper_id', 'neighbor_id')
+    )
+    op.create_index('ix_paper_neighbors_neighbor_id', 'paper_neighbors', ['neighbor_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_paper_neighbors_neighbor_id', table_name='paper_neighbors')
+    op.drop_table('paper_neighbors')
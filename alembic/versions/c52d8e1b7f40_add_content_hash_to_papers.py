@@ -0,0 +1,34 @@
+"""add content_hash to papers and ingest_jobs
+
+Revision ID: c52d8e1b7f40
+Revises: a3c91f0d52e7
+Create Date: 2025-05-18 16:40:02.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52d8e1b7f40'
+down_revision: Union[str, None] = 'a3c91f0d52e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('papers', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_papers_content_hash', 'papers', ['content_hash'], unique=True)
+    op.add_column('ingest_jobs', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_ingest_jobs_content_hash', 'ingest_jobs', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingest_jobs_content_hash', table_name='ingest_jobs')
+    op.drop_column('ingest_jobs', 'content_hash')
+    op.drop_index('ix_papers_content_hash', table_name='papers')
+    op.drop_column('papers', 'content_hash')
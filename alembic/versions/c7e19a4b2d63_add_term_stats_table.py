@@ -0,0 +1,32 @@
+"""add term_stats table
+
+Revision ID: c7e19a4b2d63
+Revises: a6f2d91c3e58
+Create Date: 2025-05-25 10:21:37.904415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e19a4b2d63'
+down_revision: Union[str, None] = 'a6f2d91c3e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('term_stats',
+    sa.Column('term', sa.String(length=200), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('term')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('term_stats')
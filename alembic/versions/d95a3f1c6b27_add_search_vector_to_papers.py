@@ -0,0 +1,32 @@
+"""add search_vector to papers
+
+Revision ID: d95a3f1c6b27
+Revises: b4d07e2a91c3
+Create Date: 2025-05-23 10:41:27.905316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd95a3f1c6b27'
+down_revision: Union[str, None] = 'b4d07e2a91c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('papers', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index('ix_papers_search_vector', 'papers', ['search_vector'], unique=False, postgresql_using='gin')
+    # 既有論文的索引內容需經 text_analysis 分析，請執行 backend/app/db/rebuild_search_index.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_papers_search_vector', table_name='papers', postgresql_using='gin')
+    op.drop_column('papers', 'search_vector')
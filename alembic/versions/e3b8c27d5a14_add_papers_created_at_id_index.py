@@ -0,0 +1,28 @@
+"""add papers created_at id index
+
+Revision ID: e3b8c27d5a14
+Revises: d95a3f1c6b27
+Create Date: 2025-05-24 09:12:45.207731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8c27d5a14'
+down_revision: Union[str, None] = 'd95a3f1c6b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_papers_created_at_id', 'papers', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_papers_created_at_id', table_name='papers')
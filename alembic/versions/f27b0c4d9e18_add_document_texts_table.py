@@ -0,0 +1,35 @@
+"""add document_texts table
+
+Revision ID: f27b0c4d9e18
+Revises: e81f4a96c3b2
+Create Date: 2025-05-20 11:26:51.730284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f27b0c4d9e18'
+down_revision: Union[str, None] = 'e81f4a96c3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_texts',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('compressed_text', sa.LargeBinary(), nullable=False),
+    sa.Column('page_offsets', sa.JSON(), nullable=False),
+    sa.Column('char_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('document_texts')
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
-from .endpoints import auth, papers
+from .endpoints import admin, auth, papers
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="", tags=["auth"])
-api_router.include_router(papers.router, prefix="/papers", tags=["papers"])
\ No newline at end of file
+api_router.include_router(papers.router, prefix="/papers", tags=["papers"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+
+from ....services.auth import get_current_admin_user
+from ....services.metadata_parser import metadata_escalations
+from ....services.llm_cache import llm_cache_stats
+from ....services.model_registry import model_registry
+
+router = APIRouter()
+
+@router.get("/models")
+async def model_status(current_user: dict = Depends(get_current_admin_user)):
+    """本地模型的載入狀態與載入耗時"""
+    return model_registry.stats()
+
+@router.get("/metadata/stats")
+async def metadata_stats(current_user: dict = Depends(get_current_admin_user)):
+    """元數據使用本地結果與改用 LLM 的次數"""
+    return metadata_escalations.stats()
+
+@router.get("/llm-cache/stats")
+async def llm_cache_status(current_user: dict = Depends(get_current_admin_user)):
+    """LLM 回應快取的命中次數與命中率"""
+    return llm_cache_stats.stats()
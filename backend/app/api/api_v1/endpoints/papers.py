@@ -1,15 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Optional, Tuple
 import os
 import shutil
 import logging
+import asyncio
+import time
 from datetime import datetime
 
-from ....db.session import get_db
+from ....db.session import get_async_db
 from ....services.paper_processor import PaperProcessor
-from ....models.paper import Paper, Topic, Keyword, Summary
-from ....schemas.paper import PaperCreate, PaperResponse, PaperList
+from ....models.paper import Paper, Topic, Keyword, Summary, Author
+from ....models.ingest_job import IngestJob
+from ....schemas.paper import PaperCreate, PaperResponse, PaperList, PaperTextResponse, PaperListItem, PaperListPage, SemanticSearchResult, SimilarPaper, SearchHit, SearchPage
+from ....schemas.ingest_job import IngestJobResponse, BulkUploadResponse, BulkFailure
+from ....services.ingest_queue import ingest_queue
+from ....services.upload_store import save_upload, spool_upload
+from ....services.bulk_ingest import BulkReport, store_archive
+from ....services.text_store import load_text
+from ....services.paper_store import parse_list_fields, list_load_options, to_list_item
+from ....services.pagination import decode_time_cursor, encode_time_cursor, estimate_count
+from ....services.search_index import search_index
+from ....services.hybrid_search import hybrid_search
+from ....services.semantic_search import semantic_search
+from ....services.similar_papers import similar_papers
+from ....services.keyword_extraction import keyword_extractor
 from ....core.config import settings
 
 # 設置日誌
@@ -18,143 +35,228 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 端點使用非同步 session；同步的索引與計算服務（全文索引、向量索引、文本讀取）
+# 以 asyncio.to_thread 在執行緒中執行，並各自開啟同步 session，不阻塞事件迴圈
+
+# 列表、搜尋與詳情會讀取的關聯：多對一以 JOIN 一併載入，關鍵字以一次 IN 查詢載入，
+# 每頁的查詢數固定，不隨筆數增加（避免 N+1）
+PAPER_LOAD_OPTIONS = (
+    joinedload(Paper.topic),
+    joinedload(Paper.summary),
+    joinedload(Paper.uploader),
+    selectinload(Paper.keywords),
+)
+
 
 
 from ....services.auth import get_current_admin_user
 from ....models.paper import Paper as PaperModel
-from sqlalchemy import text
+from sqlalchemy import text, tuple_
 from sqlalchemy.orm.exc import StaleDataError
 
+def _remove_from_indexes(paper_id: int, referrers: List[int]):
+    search_index.remove_paper(paper_id)
+    semantic_search.remove_paper(paper_id)
+    similar_papers.recompute(referrers)
+
 @router.delete("/{paper_id}", status_code=204)
-def delete_paper(paper_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)):
-    result = db.execute(text("DELETE FROM papers WHERE id = :paper_id"), {"paper_id": paper_id})
+async def delete_paper(paper_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_admin_user)):
+    row = (await db.execute(
+        select(Paper.title, Paper.abstract, Paper.content_hash).where(Paper.id == paper_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    # 刪除前記下相似列表中含有此論文的論文，刪除後重新計算它們的列表
+    referrers = await db.run_sync(similar_papers.referrers, paper_id)
+    # 在同一交易中自關鍵詞文件頻率統計扣除此論文
+    document = await asyncio.to_thread(keyword_extractor.document_text, *row)
+    await db.run_sync(keyword_extractor.remove_documents, [document])
+    result = await db.execute(text("DELETE FROM papers WHERE id = :paper_id"), {"paper_id": paper_id})
     if result.rowcount == 0:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Paper not found")
-    db.commit()
+    await db.commit()
+    await asyncio.to_thread(_remove_from_indexes, paper_id, referrers)
     return {}
 paper_processor = PaperProcessor()
 
 from ....services.auth import get_current_user
 
-@router.post("/upload", response_model=PaperResponse)
+@router.post("/upload", response_model=IngestJobResponse, status_code=202)
 async def upload_paper(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """上傳並處理論文文件"""
+    """上傳論文文件並排入背景處理佇列，立即回傳工作 id"""
     try:
-        # 保存上傳的文件
-        file_path = os.path.join(settings.UPLOAD_FOLDER, file.filename)
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # 處理論文
-        processor = PaperProcessor()
-        paper_data = await processor.process_paper(file_path)
-        
-        # 創建摘要對象
-        summary = Summary(
-            content=paper_data["summary"]["content"],
-            created_at=datetime.utcnow()
+        # 以內容雜湊保存上傳的文件
+        file_path, content_hash = await save_upload(file)
+
+        # 建立處理工作，由背景 worker 執行文本提取與 LLM 處理；
+        # 相同內容的文件直接回傳既有論文，不重新處理
+        job = await db.run_sync(
+            ingest_queue.enqueue, file_path, file.filename, current_user["id"], content_hash=content_hash
         )
-        
-        # 創建論文記錄，記錄上傳者
-        paper = Paper(
-            title=paper_data["title"][:500],
-            authors=str(paper_data["authors"]),  # 將列表轉換為字符串
-            journal=paper_data["journal"],
-            year=paper_data["year"],
-            abstract=paper_data["abstract"],
-            file_path=file_path,
-            summary=summary,  # 直接設置 summary 關係
-            uploader_id=current_user["id"]
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"上傳論文時發生錯誤: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"處理論文時發生錯誤: {str(e)}"
         )
-        
-        # 添加關鍵詞
-        for keyword_text in paper_data["keywords"]:
-            # 檢查關鍵詞是否已存在
-            existing_keyword = db.query(Keyword).filter(Keyword.word == keyword_text).first()
-            if existing_keyword:
-                paper.keywords.append(existing_keyword)
-            else:
-                new_keyword = Keyword(word=keyword_text)
-                paper.keywords.append(new_keyword)
-        
-        db.add(paper)
-        db.commit()
-        db.refresh(paper)
-        
-        # 構建符合 PaperResponse 模型的響應
-        response = PaperResponse(
+
+@router.post("/upload/bulk", response_model=BulkUploadResponse, status_code=202)
+async def upload_archive(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """上傳 zip / tar 壓縮檔，逐一保存其中的論文並批次排入處理佇列"""
+    report = BulkReport()
+    archive_path = None
+    try:
+        archive_path, _ = await spool_upload(file, max_size=settings.BULK_MAX_CONTENT_LENGTH)
+        stored = await asyncio.to_thread(store_archive, archive_path, report)
+        jobs = await db.run_sync(ingest_queue.enqueue_many, stored, current_user["id"])
+        report.finished_at = time.monotonic()
+        return BulkUploadResponse(
+            jobs=[IngestJobResponse.model_validate(job) for job in jobs],
+            failures=[BulkFailure(filename=name, error=error) for name, error in report.failures],
+            elapsed_seconds=report.elapsed,
+            files_per_minute=len(stored) * 60 / report.elapsed if report.elapsed > 0 else 0.0
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"批次上傳論文時發生錯誤: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"批次上傳論文時發生錯誤: {str(e)}")
+    finally:
+        if archive_path and os.path.exists(archive_path):
+            os.remove(archive_path)
+
+@router.get("/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """查詢論文處理工作的狀態、階段與進度"""
+    job = await db.get(IngestJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="工作不存在")
+    return job
+
+async def _paper_page(db: AsyncSession, statement, fields: List[str], limit: int, after: Optional[Tuple[datetime, int]]) -> PaperListPage:
+    """依 (created_at, id) 由新到舊排序，以游標（keyset）取出一頁論文
+
+    statement 只包含篩選條件；after 為 decode_time_cursor 解出的位置，第一頁（None）另外回傳總數估計。
+    """
+    page_statement = statement.order_by(Paper.created_at.desc(), Paper.id.desc())
+    if after:
+        page_statement = page_statement.where(tuple_(Paper.created_at, Paper.id) < tuple_(*after))
+    # 產生游標需要 created_at，即使未要求回傳
+    papers = (await db.execute(
+        page_statement.options(*list_load_options(list(dict.fromkeys(fields + ["created_at"]))))
+        .limit(limit + 1)
+    )).unique().scalars().all()
+    page = PaperListPage(items=[PaperListItem(**to_list_item(paper, fields)) for paper in papers[:limit]])
+    if len(papers) > limit:
+        page.next_cursor = encode_time_cursor(papers[limit - 1].created_at, papers[limit - 1].id)
+    if after is None:
+        filtered = statement.whereclause is not None
+        page.total_estimate, page.total_exact = await estimate_count(
+            db, statement.with_only_columns(Paper.id), "papers", filtered, settings.COUNT_ESTIMATE_CAP
+        )
+    return page
+
+@router.get("/", response_model=PaperListPage, response_model_exclude_unset=True)
+async def list_papers(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="逗號分隔的回傳欄位，例如 title,year,abstract"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """獲取論文列表：依上傳時間由新到舊排序，以 next_cursor 取得下一頁
+
+    預設只回傳列表所需欄位，詳情請使用 /{paper_id}。
+    """
+    # 只有欄位與游標參數的錯誤屬於請求錯誤，查詢與序列化的錯誤以 500 回報
+    try:
+        selected = parse_list_fields(fields)
+        after = decode_time_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await _paper_page(db, select(Paper), selected, limit, after)
+    except Exception as e:
+        logger.error(f"獲取論文列表時發生錯誤: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"獲取論文列表時發生錯誤: {str(e)}")
+
+async def _load_papers(db: AsyncSession, hits) -> dict:
+    """載入 (paper_id, score) 結果中的論文與列表所需的關聯，回傳 {paper_id: Paper}"""
+    if not hits:
+        return {}
+    result = await db.execute(
+        select(Paper).options(*PAPER_LOAD_OPTIONS).where(Paper.id.in_([paper_id for paper_id, _ in hits]))
+    )
+    return {paper.id: paper for paper in result.unique().scalars()}
+
+def _scored_papers(papers: dict, hits, schema, extra=None):
+    """依 (paper_id, score) 的順序組成含分數的論文列表，已刪除的論文略過
+
+    papers 為 _load_papers 的結果；extra 可傳入函式，依論文回傳額外欄位（例如搜尋片段）。
+    """
+    return [
+        schema(
             id=paper.id,
             title=paper.title,
-            authors=eval(paper.authors) if paper.authors else [],  # 將字符串轉換回列表
+            authors=paper.authors or [],
             journal=paper.journal,
             year=paper.year,
             abstract=paper.abstract,
-            content=paper.content,
             file_path=paper.file_path,
-            github_link=paper.github_link,
             created_at=paper.created_at,
-            updated_at=paper.updated_at,
-            topic=paper.topic,
-            summary=paper.summary,
-            keywords=paper.keywords,
+            summary=paper.summary.content if paper.summary else None,
+            keywords=[keyword.word for keyword in paper.keywords],
             uploader_id=paper.uploader_id,
-            uploader_name=current_user.get("name") or current_user.get("username")
-        )
-        
-        return response
-    except Exception as e:
-        logger.error(f"上傳論文時發生錯誤: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"處理論文時發生錯誤: {str(e)}"
+            uploader_name=paper.uploader.name if paper.uploader and paper.uploader.name else (paper.uploader.username if paper.uploader else None),
+            score=score,
+            **(extra(paper) if extra else {})
         )
+        for paper_id, score in hits
+        if (paper := papers.get(paper_id)) is not None
+    ]
 
-@router.get("/", response_model=List[PaperList])
-def list_papers(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+@router.get("/semantic-search", response_model=List[SemanticSearchResult])
+async def semantic_search_papers(
+    q: str,
+    k: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """獲取論文列表"""
+    """以語意相似度搜尋論文（標題、摘要與全文分塊），回傳最相似的 k 篇"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="查詢不可為空")
     try:
-        papers = db.query(Paper).offset(skip).limit(limit).all()
-        return [
-            PaperList(
-                id=paper.id,
-                title=paper.title,
-                authors=eval(paper.authors) if paper.authors else [],
-                journal=paper.journal,
-                year=paper.year,
-                abstract=paper.abstract,
-                content=paper.content,
-                file_path=paper.file_path,
-                created_at=paper.created_at,
-                updated_at=paper.updated_at,
-                topic=paper.topic.name if paper.topic else None,
-                summary=paper.summary.content if paper.summary else None,
-                keywords=[k.word for k in paper.keywords],
-                uploader_id=paper.uploader_id,
-                uploader_name=paper.uploader.name if paper.uploader and paper.uploader.name else (paper.uploader.username if paper.uploader else None)
-            )
-            for paper in papers
-        ]
+        hits = await asyncio.to_thread(semantic_search.search, q, k)
+        return _scored_papers(await _load_papers(db, hits), hits, SemanticSearchResult)
     except Exception as e:
-        logger.error(f"獲取論文列表時發生錯誤: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"獲取論文列表時發生錯誤: {str(e)}")
+        logger.error(f"語意搜尋論文時發生錯誤: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"語意搜尋論文時發生錯誤: {str(e)}")
 
 @router.get("/{paper_id}", response_model=PaperResponse)
-def get_paper(
+async def get_paper(
     paper_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """獲取單篇論文詳情"""
     try:
-        paper = db.query(Paper).filter(Paper.id == paper_id).first()
+        paper = (await db.execute(
+            select(Paper).options(*PAPER_LOAD_OPTIONS).where(Paper.id == paper_id)
+        )).unique().scalar_one_or_none()
         if not paper:
             raise HTTPException(status_code=404, detail="論文不存在")
             
@@ -162,11 +264,12 @@ def get_paper(
         response = PaperResponse(
             id=paper.id,
             title=paper.title,
-            authors=eval(paper.authors) if paper.authors else [],
+            authors=paper.authors or [],
             journal=paper.journal,
             year=paper.year,
             abstract=paper.abstract,
-            content=paper.content,
+            # 全文保存在壓縮的全文存放區，由 /{paper_id}/text 提供
+            content=None,
             file_path=paper.file_path,
             github_link=None,  # 添加這個字段
             created_at=paper.created_at,
@@ -196,41 +299,116 @@ def get_paper(
         logger.error(f"獲取論文詳情時發生錯誤: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"獲取論文詳情時發生錯誤: {str(e)}")
 
-@router.get("/search/", response_model=List[PaperList])
-def search_papers(
+@router.get("/{paper_id}/text", response_model=PaperTextResponse)
+async def get_paper_text(
+    paper_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """獲取論文提取後的全文與分頁位置"""
+    row = (await db.execute(select(Paper.id, Paper.content_hash).where(Paper.id == paper_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="論文不存在")
+    stored = await asyncio.to_thread(load_text, row.content_hash) if row.content_hash else None
+    if stored is None:
+        raise HTTPException(status_code=404, detail="論文全文不存在")
+    return PaperTextResponse(paper_id=row.id, text=stored.text, page_offsets=stored.page_offsets)
+
+@router.get("/{paper_id}/similar", response_model=List[SimilarPaper])
+async def get_similar_papers(
+    paper_id: int,
+    k: int = Query(settings.SIMILAR_PAPERS_K, ge=1, le=settings.SIMILAR_PAPERS_K),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """獲取預先計算的相似論文列表"""
+    if not (await db.execute(select(Paper.id).where(Paper.id == paper_id))).first():
+        raise HTTPException(status_code=404, detail="論文不存在")
+    try:
+        hits = await db.run_sync(similar_papers.get, paper_id, k)
+        if not hits:
+            # 尚未計算過（例如舊論文）時即時計算並保存
+            hits = await asyncio.to_thread(similar_papers.backfill, paper_id, k)
+        return _scored_papers(await _load_papers(db, hits), hits, SimilarPaper)
+    except Exception as e:
+        logger.error(f"獲取相似論文時發生錯誤: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"獲取相似論文時發生錯誤: {str(e)}")
+
+@router.get("/search/fulltext", response_model=SearchPage)
+async def fulltext_search_papers(
+    response: Response,
+    q: str,
+    mode: str = Query("lexical", pattern="^(lexical|semantic|hybrid)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    lexical_weight: Optional[float] = Query(None, ge=0),
+    semantic_weight: Optional[float] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """搜尋論文並以游標分頁
+
+    mode=lexical：全文搜尋標題、摘要、中文摘要與全文；mode=semantic：向量語意搜尋；
+    mode=hybrid：同時執行兩者並以 RRF 融合（可用 lexical_weight / semantic_weight 調整）。
+    各階段耗時以 Server-Timing 標頭回傳。
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="查詢不可為空")
+    timings = {}
+    try:
+        hits, next_cursor = await hybrid_search.search(
+            q, mode, limit, cursor, lexical_weight, semantic_weight, timings
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        terms = search_index.query_terms(q)
+        start = time.perf_counter()
+        papers = await _load_papers(db, hits)
+        # 片段可能需要讀取壓縮的全文，在執行緒中產生
+        items = await asyncio.to_thread(
+            _scored_papers,
+            papers, hits, SearchHit, lambda paper: {"snippet": search_index.snippet(paper, terms)}
+        )
+        timings["hydrate"] = (time.perf_counter() - start) * 1000
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={duration:.1f}" for name, duration in timings.items()
+        )
+        return SearchPage(items=items, next_cursor=next_cursor)
+    except Exception as e:
+        logger.error(f"全文搜尋論文時發生錯誤: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"全文搜尋論文時發生錯誤: {str(e)}")
+
+@router.get("/search/", response_model=PaperListPage, response_model_exclude_unset=True)
+async def search_papers(
     keyword: str = None,
     topic: str = None,
-    db: Session = Depends(get_db)
+    author: str = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="逗號分隔的回傳欄位，例如 title,year,abstract"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """搜尋論文"""
+    """依關鍵詞、主題或作者搜尋論文，依上傳時間排序並以游標分頁
+
+    作者需完整比對姓名（使用 authors 表的索引）。
+    """
     try:
-        query = db.query(Paper)
+        selected = parse_list_fields(fields)
+        after = decode_time_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        statement = select(Paper)
         
+        # 以 EXISTS 子查詢篩選，避免 JOIN 關鍵字造成重複列並與預先載入的 JOIN 重疊
         if keyword:
-            query = query.join(Paper.keywords).filter(Keyword.word.ilike(f"%{keyword}%"))
+            statement = statement.where(Paper.keywords.any(Keyword.word.ilike(f"%{keyword}%")))
         
         if topic:
-            query = query.join(Paper.topic).filter(Topic.name.ilike(f"%{topic}%"))
+            statement = statement.where(Paper.topic.has(Topic.name.ilike(f"%{topic}%")))
+
+        if author:
+            statement = statement.where(Paper.author_entries.any(Author.name == author.strip()))
         
-        papers = query.all()
-        return [
-            PaperList(
-                id=paper.id,
-                title=paper.title,
-                authors=eval(paper.authors) if paper.authors else [],
-                journal=paper.journal,
-                year=paper.year,
-                abstract=paper.abstract,
-                content=paper.content,
-                file_path=paper.file_path,
-                created_at=paper.created_at,
-                updated_at=paper.updated_at,
-                topic=paper.topic.name if paper.topic else None,
-                summary=paper.summary.content if paper.summary else None,
-                keywords=[k.word for k in paper.keywords]
-            )
-            for paper in papers
-        ]
+        return await _paper_page(db, statement, selected, limit, after)
     except Exception as e:
         logger.error(f"搜尋論文時發生錯誤: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"搜尋論文時發生錯誤: {str(e)}")
@@ -18,6 +18,11 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "paper_management")
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # 連線池設置（同步與非同步引擎各自一組連線池）
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # 秒，取得連線的等待上限
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 秒，超過後重新建立連線
 
     # JWT 設置
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key")
@@ -29,6 +34,75 @@ class Settings(BaseSettings):
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     UPLOAD_FOLDER: str = os.path.join(BASE_DIR, "uploads")
     MAX_CONTENT_LENGTH: int = 16 * 1024 * 1024  # 16MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 串流寫入的分塊大小 1MB
+
+    # 文本提取設置
+    EXTRACTION_WORKERS: int = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+    PDF_PAGES_PER_SHARD: int = int(os.getenv("PDF_PAGES_PER_SHARD", "40"))  # 長 PDF 每個子進程處理的頁數
+
+    # 批次匯入設置
+    BULK_MAX_CONTENT_LENGTH: int = 1024 * 1024 * 1024  # 壓縮檔上限 1GB
+    BULK_INGEST_CONCURRENCY: int = int(os.getenv("BULK_INGEST_CONCURRENCY", "4"))  # 同時處理的論文數
+    BULK_INGEST_BATCH_SIZE: int = int(os.getenv("BULK_INGEST_BATCH_SIZE", "20"))  # 每次提交的論文數
+
+    # 背景處理佇列設置
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", "2"))
+    INGEST_POLL_INTERVAL: float = float(os.getenv("INGEST_POLL_INTERVAL", "2.0"))  # 秒
+    INGEST_STALE_SECONDS: int = int(os.getenv("INGEST_STALE_SECONDS", "600"))  # running 工作逾時視為中斷
+    INGEST_MAX_ATTEMPTS: int = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+    INGEST_HEARTBEAT_SECONDS: float = float(os.getenv("INGEST_HEARTBEAT_SECONDS", "60"))  # 需小於 INGEST_STALE_SECONDS
+    # 單篇論文同時進行的處理階段（LLM 呼叫）上限
+    PAPER_STAGE_CONCURRENCY: int = int(os.getenv("PAPER_STAGE_CONCURRENCY", "3"))
+
+    # 長文件 map-reduce 摘要設置（token 數為粗估值）
+    SUMMARY_CHUNK_TOKENS: int = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))  # 單一分塊上限，全文未超過時直接摘要
+    SUMMARY_REDUCE_TOKENS: int = int(os.getenv("SUMMARY_REDUCE_TOKENS", "6000"))  # reduce 呼叫的筆記總量上限
+    SUMMARY_NOTE_TOKENS: int = int(os.getenv("SUMMARY_NOTE_TOKENS", "400"))  # 每個分塊筆記的輸出上限
+    SUMMARY_MAP_CONCURRENCY: int = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+
+    # 本地模型設置：啟動後於背景預先載入的模型（逗號分隔，例如 "sentence,summarizer"），
+    # 其餘模型在第一次使用時載入；閒置超過 MODEL_IDLE_SECONDS 的模型會被卸載（0 表示不卸載）
+    PRELOAD_MODELS: str = os.getenv("PRELOAD_MODELS", "")
+    MODEL_IDLE_SECONDS: int = int(os.getenv("MODEL_IDLE_SECONDS", "1800"))
+
+    # 本地元數據（論文開頭、PDF 內嵌資訊、DOI / arXiv）的信心低於此值時才呼叫 LLM 解析元數據
+    METADATA_CONFIDENCE_THRESHOLD: float = float(os.getenv("METADATA_CONFIDENCE_THRESHOLD", "0.7"))
+
+    # 元數據、英文摘要與中文摘要以單次結構化（JSON）LLM 呼叫取得，全文只送出一次
+    LLM_COMBINED_CALL: bool = os.getenv("LLM_COMBINED_CALL", "true").lower() == "true"
+
+    # LLM 回應快取設置
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))  # 30 天
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    # 每寫入多少筆執行一次過期與容量清理（清理需計數整個快取表）
+    LLM_CACHE_EVICT_EVERY: int = int(os.getenv("LLM_CACHE_EVICT_EVERY", "100"))
+
+    # 論文列表分頁：總數估計最多精確計數的筆數
+    COUNT_ESTIMATE_CAP: int = int(os.getenv("COUNT_ESTIMATE_CAP", "10000"))
+
+    # 全文搜尋設置：每篇論文建立索引的全文字元上限（PostgreSQL tsvector 上限為 1MB）
+    SEARCH_CONTENT_CHARS: int = int(os.getenv("SEARCH_CONTENT_CHARS", "200000"))
+
+    # 語意搜尋設置：向量索引存放目錄、全文分塊大小（token 粗估值）與每篇論文的分塊上限
+    VECTOR_INDEX_DIR: str = os.getenv("VECTOR_INDEX_DIR", os.path.join(BASE_DIR, "index", "vectors"))
+    SEMANTIC_CHUNK_TOKENS: int = int(os.getenv("SEMANTIC_CHUNK_TOKENS", "200"))
+    SEMANTIC_MAX_CHUNKS: int = int(os.getenv("SEMANTIC_MAX_CHUNKS", "64"))
+    # 向量數達到 ANN_MIN_TRAIN 後改用 IVF 近似搜尋，查詢時比對 ANN_NPROBE 個分群
+    ANN_MIN_TRAIN: int = int(os.getenv("ANN_MIN_TRAIN", "4096"))
+    ANN_NPROBE: int = int(os.getenv("ANN_NPROBE", "16"))
+    # 混合搜尋設置：全文與語意各取前 HYBRID_CANDIDATES 筆，以 RRF（k=HYBRID_RRF_K）加權融合
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", "100"))
+    HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", "60"))
+    HYBRID_LEXICAL_WEIGHT: float = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "1.0"))
+    HYBRID_SEMANTIC_WEIGHT: float = float(os.getenv("HYBRID_SEMANTIC_WEIGHT", "1.0"))
+    # 每篇論文預先計算並保存的相似論文數
+    SIMILAR_PAPERS_K: int = int(os.getenv("SIMILAR_PAPERS_K", "10"))
+    # 本地關鍵詞提取（TF-IDF）：回傳數量、片語最長字數、每篇讀取的全文字元上限與候選詞上限
+    KEYWORD_COUNT: int = int(os.getenv("KEYWORD_COUNT", "10"))
+    KEYWORD_MAX_NGRAM: int = int(os.getenv("KEYWORD_MAX_NGRAM", "3"))
+    KEYWORD_MAX_CHARS: int = int(os.getenv("KEYWORD_MAX_CHARS", "100000"))
+    KEYWORD_MAX_CANDIDATES: int = int(os.getenv("KEYWORD_MAX_CANDIDATES", "2000"))
 
     # OpenAI API 密鑰設置，請在 .env 中設置 OPENAI_API_KEY
     OPENAI_API_KEY: str
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+import argparse
+import asyncio
+import logging
+
+from backend.app.core.config import settings
+from backend.app.services.bulk_ingest import BulkReport, collect_files, skip_duplicates, ingest_files
+from backend.app.services.paper_processor import PaperProcessor
+from backend.app.services import text_extraction
+
+# 設置日誌
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def bulk_ingest(paths, uploader_id=None, concurrency=settings.BULK_INGEST_CONCURRENCY,
+                      batch_size=settings.BULK_INGEST_BATCH_SIZE) -> BulkReport:
+    """離線批次匯入壓縮檔、目錄或單一論文文件"""
+    report = BulkReport()
+    files = await asyncio.to_thread(collect_files, paths, report)
+    files = skip_duplicates(files, report)
+    logger.info(f"共 {len(files)} 篇待處理，{len(report.duplicates)} 篇已存在")
+
+    processor = PaperProcessor()
+    try:
+        await ingest_files(files, processor, uploader_id, concurrency, batch_size, report)
+    finally:
+        text_extraction.shutdown_pool()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="批次匯入論文（zip / tar 壓縮檔、目錄或 PDF/DOCX 文件）")
+    parser.add_argument("paths", nargs="+", help="壓縮檔、目錄或文件路徑")
+    parser.add_argument("--uploader-id", type=int, default=None, help="記錄為上傳者的使用者 id")
+    parser.add_argument("--concurrency", type=int, default=settings.BULK_INGEST_CONCURRENCY, help="同時處理的論文數")
+    parser.add_argument("--batch-size", type=int, default=settings.BULK_INGEST_BATCH_SIZE, help="每次提交資料庫的論文數")
+    args = parser.parse_args()
+
+    report = asyncio.run(bulk_ingest(args.paths, args.uploader_id, args.concurrency, args.batch_size))
+
+    print(f"完成：匯入 {len(report.processed)} 篇，重複 {len(report.duplicates)} 篇，失敗 {len(report.failures)} 篇")
+    print(f"耗時 {report.elapsed:.1f} 秒，{report.papers_per_minute:.1f} 篇/分鐘")
+    for name, error in report.failures:
+        print(f"  失敗 {name}: {error}")
+    sys.exit(1 if report.failures else 0)
+
+if __name__ == "__main__":
+    main()
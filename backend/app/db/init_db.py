@@ -5,8 +5,13 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from backend.app.db.base_class import Base
-from ..models.paper import Paper, Topic, Keyword, Summary
+from ..models.paper import Paper, Topic, Keyword, Summary, Author
 from ..models.login_attempt import LoginAttempt
+from ..models.ingest_job import IngestJob
+from ..models.llm_cache import LLMCacheEntry
+from ..models.document_text import DocumentText
+from ..models.paper_neighbor import PaperNeighbor
+from ..models.term_stat import TermStat
 from ..core.config import settings
 import logging
 
@@ -22,7 +27,14 @@ def init_db():
     # 刪除所有現有表格
     logger.info("刪除現有表格...")
     with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS ingest_jobs CASCADE"))
+        conn.execute(text("DROP TABLE IF EXISTS llm_cache_entries CASCADE"))
+        conn.execute(text("DROP TABLE IF EXISTS document_texts CASCADE"))
+        conn.execute(text("DROP TABLE IF EXISTS paper_neighbors CASCADE"))
+        conn.execute(text("DROP TABLE IF EXISTS term_stats CASCADE"))
         conn.execute(text("DROP TABLE IF EXISTS figures CASCADE"))
+        conn.execute(text("DROP TABLE IF EXISTS paper_author CASCADE"))
+        conn.execute(text("DROP TABLE IF EXISTS authors CASCADE"))
         conn.execute(text("DROP TABLE IF EXISTS papers CASCADE"))
         conn.execute(text("DROP TABLE IF EXISTS topics CASCADE"))
         conn.execute(text("DROP TABLE IF EXISTS keywords CASCADE"))
@@ -0,0 +1,24 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+import argparse
+import logging
+
+from backend.app.services.keyword_extraction import keyword_extractor
+
+# 設置日誌
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="重新計算關鍵詞提取的文件頻率統計")
+    parser.add_argument("--batch-size", type=int, default=100, help="每批處理的論文數")
+    parser.add_argument("--update-keywords", action="store_true", help="以新統計重新提取並取代所有論文的關鍵詞")
+    args = parser.parse_args()
+
+    count = keyword_extractor.rebuild(args.batch_size, args.update_keywords)
+    print(f"完成：已統計 {count} 篇論文的關鍵詞文件頻率")
+
+if __name__ == "__main__":
+    main()
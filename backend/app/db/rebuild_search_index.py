@@ -0,0 +1,26 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+import argparse
+import logging
+
+from backend.app.services.search_index import search_index
+
+# 設置日誌
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="重建論文全文搜尋索引")
+    parser.add_argument("--paper-id", type=int, nargs="*", help="只重新索引指定的論文（預設重建全部）")
+    args = parser.parse_args()
+
+    if args.paper_id:
+        indexed = search_index.index_papers(args.paper_id)
+    else:
+        indexed = search_index.rebuild()
+    print(f"完成：已建立 {indexed} 篇論文的全文索引")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+import argparse
+import logging
+
+from backend.app.services.semantic_search import semantic_search
+
+# 設置日誌
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="重建論文語意搜尋的向量索引")
+    parser.add_argument("--paper-id", type=int, nargs="*", help="只重新索引指定的論文（預設重建全部）")
+    args = parser.parse_args()
+
+    if args.paper_id:
+        indexed = semantic_search.index_papers(args.paper_id)
+        total = len(args.paper_id)
+    else:
+        indexed = semantic_search.rebuild()
+        total = None
+    print(f"完成：已索引 {indexed} 篇論文" + (f"（共 {total} 篇）" if total is not None else ""))
+    print(f"向量索引共 {semantic_search.index.size} 列")
+
+if __name__ == "__main__":
+    main()
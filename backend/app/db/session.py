@@ -1,14 +1,47 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+# 非同步引擎使用的驅動程式
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def _async_uri(uri: str) -> str:
+    scheme, rest = uri.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+def _pool_options(uri: str) -> dict:
+    # SQLite 不使用 QueuePool，不支援連線池大小等參數
+    if uri.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+# 同步引擎：背景處理佇列、索引服務與命令列工具使用
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True, **_pool_options(settings.SQLALCHEMY_DATABASE_URI)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同步引擎：論文 API 使用，查詢與提交不會阻塞事件迴圈
+async_engine = create_async_engine(
+    _async_uri(settings.SQLALCHEMY_DATABASE_URI), pool_pre_ping=True, **_pool_options(settings.SQLALCHEMY_DATABASE_URI)
+)
+# 提交後不使物件過期，回應序列化時不需再次查詢（非同步 session 無法延遲載入）
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # 依賴注入
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
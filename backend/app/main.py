@@ -1,8 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .core.config import settings
 from .api.api_v1.api import api_router
+from .services.ingest_queue import ingest_queue
+from .services import text_extraction
+from .services.model_registry import model_registry
+from .db.session import async_engine
+import asyncio
 import os
 
 app = FastAPI(
@@ -11,6 +17,27 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# 依 Content-Length 提前拒絕過大的上傳請求，避免解析整個 multipart 內容
+# （需在 CORS 之前註冊，讓 413 回應也帶有 CORS 標頭）
+UPLOAD_LIMITS = {
+    "/papers/upload": settings.MAX_CONTENT_LENGTH,
+    "/papers/upload/bulk": settings.BULK_MAX_CONTENT_LENGTH,
+}
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.method == "POST":
+        path = request.url.path.rstrip("/")
+        limit = next((v for k, v in UPLOAD_LIMITS.items() if path.endswith(k)), None)
+        content_length = request.headers.get("content-length")
+        # multipart 邊界與表單欄位另外保留 64KB
+        if limit and content_length and int(content_length) > limit + 64 * 1024:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"文件大小超過上限 {limit // (1024 * 1024)}MB"}
+            )
+    return await call_next(request)
+
 # 設置 CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +50,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 讓前端可讀取搜尋各階段耗時
+    expose_headers=["Server-Timing"],
 )
 
 # 確保上傳目錄存在
@@ -35,6 +64,26 @@ app.mount("/static", StaticFiles(directory=settings.UPLOAD_FOLDER), name="static
 # 包含 API 路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# 啟動與關閉背景論文處理佇列；模型不在啟動時同步載入
+background_tasks = []
+
+@app.on_event("startup")
+async def start_ingest_queue():
+    await ingest_queue.start()
+    preload = [name.strip() for name in settings.PRELOAD_MODELS.split(",") if name.strip()]
+    if preload:
+        background_tasks.append(asyncio.create_task(model_registry.preload(preload)))
+    if settings.MODEL_IDLE_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(model_registry.reap_idle(settings.MODEL_IDLE_SECONDS)))
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    for task in background_tasks:
+        task.cancel()
+    await ingest_queue.stop()
+    text_extraction.shutdown_pool()
+    await async_engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "歡迎使用論文整理系統"}
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, JSON
+from datetime import datetime
+from ..db.base_class import Base
+
+class DocumentText(Base):
+    """文件提取後的全文（zlib 壓縮），以內容雜湊對應 papers.content_hash"""
+    __tablename__ = "document_texts"
+
+    content_hash = Column(String(64), primary_key=True)
+    compressed_text = Column(LargeBinary, nullable=False)
+    # 每頁起始字元位置（DOCX 視為單頁）
+    page_offsets = Column(JSON, nullable=False, default=list)
+    char_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+from ..db.base_class import Base
+
+class IngestJob(Base):
+    """論文處理工作（上傳後由背景 worker 執行）"""
+    __tablename__ = "ingest_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String(500), nullable=False)
+    file_path = Column(String(500), nullable=False)
+    content_hash = Column(String(64), index=True, nullable=True)
+    # pending / running / done / failed
+    status = Column(String(20), nullable=False, default='pending', index=True)
+    stage = Column(String(50), nullable=False, default='queued')
+    progress = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    uploader_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    paper_id = Column(Integer, ForeignKey('papers.id', ondelete='SET NULL'), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # 同時作為 worker 心跳，超時未更新的 running 工作會被重新領取
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+from ..db.base_class import Base
+
+class LLMCacheEntry(Base):
+    """LLM 回應快取"""
+    __tablename__ = "llm_cache_entries"
+
+    # sha256(model, system prompt, 參數, 輸入文本雜湊)
+    key = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False)
+    response = Column(Text, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
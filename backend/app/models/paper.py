@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from ..db.base_class import Base
+from .document_text import DocumentText
 
 # 論文-關鍵字關聯表
 paper_keyword = Table(
@@ -11,18 +13,33 @@ paper_keyword = Table(
     Column('keyword_id', Integer, ForeignKey('keywords.id', ondelete='CASCADE'))
 )
 
+# 論文-作者關聯表（position 為作者在論文中的順序），依作者查詢論文時使用 author_id 索引
+paper_author = Table(
+    'paper_author',
+    Base.metadata,
+    Column('paper_id', Integer, ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True),
+    Column('author_id', Integer, ForeignKey('authors.id', ondelete='CASCADE'), primary_key=True, index=True),
+    Column('position', Integer, nullable=False, default=0)
+)
+
 class Paper(Base):
     __tablename__ = "papers"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False)
-    authors = Column(String(500), nullable=False, default='[]')
+    # 作者列表（依論文中的順序），回傳時不需再解析；正規化的作者見 author_entries
+    authors = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False, default=list)
     journal = Column(String(200), nullable=True)
     year = Column(Integer, nullable=True)
     abstract = Column(Text, nullable=True)
-    content = Column(Text, nullable=True)
+    # 全文僅在明確存取時載入，列表查詢不會帶出
+    content = deferred(Column(Text, nullable=True))
     file_path = Column(String(500), nullable=True)
+    # 文件內容 SHA-256，用於重複上傳判斷
+    content_hash = Column(String(64), unique=True, index=True, nullable=True)
     github_link = Column(String(500), nullable=True)
+    # 全文搜尋向量（標題、摘要、中文摘要與全文），由 services/search_index 維護
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -34,7 +51,24 @@ class Paper(Base):
     topic_id = Column(Integer, ForeignKey('topics.id', ondelete='SET NULL'), nullable=True)
     topic = relationship("Topic", back_populates="papers")
     keywords = relationship("Keyword", secondary=paper_keyword, back_populates="papers")
+    # 由 services/paper_store 依 authors 寫入關聯表，此處只供查詢
+    author_entries = relationship(
+        "Author", secondary=paper_author, order_by=paper_author.c.position, viewonly=True
+    )
     summary = relationship("Summary", back_populates="paper", uselist=False, cascade="all, delete-orphan")
+    # 壓縮保存的提取全文（以內容雜湊對應）
+    document_text = relationship(
+        "DocumentText",
+        primaryjoin="foreign(Paper.content_hash) == DocumentText.content_hash",
+        uselist=False,
+        viewonly=True
+    )
+
+    __table_args__ = (
+        Index('ix_papers_search_vector', 'search_vector', postgresql_using='gin'),
+        # 列表依 (created_at, id) 排序與游標分頁
+        Index('ix_papers_created_at_id', 'created_at', 'id'),
+    )
 
 # 在 User model 也要加上 uploaded_papers 關聯
 class Topic(Base):
@@ -54,6 +88,14 @@ class Keyword(Base):
     
     papers = relationship("Paper", secondary=paper_keyword, back_populates="keywords")
 
+class Author(Base):
+    __tablename__ = "authors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), unique=True, index=True, nullable=False)
+
+    papers = relationship("Paper", secondary=paper_author, viewonly=True)
+
 class Summary(Base):
     __tablename__ = "summaries"
 
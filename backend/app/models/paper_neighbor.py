@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from ..db.base_class import Base
+
+class PaperNeighbor(Base):
+    """預先計算的相似論文列表，每篇論文保留分數最高的前 k 篇"""
+    __tablename__ = "paper_neighbors"
+
+    paper_id = Column(Integer, ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True, index=True)
+    score = Column(Float, nullable=False)
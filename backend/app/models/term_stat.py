@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from ..db.base_class import Base
+
+# 保留的詞彙列：記錄已納入統計的文件數（IDF 的分母）
+DOCUMENT_COUNT_TERM = ""
+
+class TermStat(Base):
+    """關鍵詞候選詞（單字與片語）的文件頻率，由 services/keyword_extraction 增量維護"""
+    __tablename__ = "term_stats"
+
+    term = Column(String(200), primary_key=True)
+    document_count = Column(Integer, nullable=False, default=0)
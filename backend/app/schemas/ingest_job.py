@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class IngestJobResponse(BaseModel):
+    id: int
+    filename: str
+    status: str
+    stage: str
+    progress: int
+    error: Optional[str] = None
+    paper_id: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class BulkFailure(BaseModel):
+    filename: str
+    error: str
+
+class BulkUploadResponse(BaseModel):
+    jobs: List[IngestJobResponse] = []
+    failures: List[BulkFailure] = []
+    elapsed_seconds: float
+    files_per_minute: float
@@ -66,6 +66,44 @@ class PaperList(PaperBase):
     class Config:
         from_attributes = True
 
+class SemanticSearchResult(PaperList):
+    score: float
+
+class SimilarPaper(PaperList):
+    score: float
+
+class SearchHit(PaperList):
+    score: float
+    # 含查詢詞的片段，符合的詞彙以 <mark> 標示
+    snippet: Optional[str] = None
+
+class SearchPage(BaseModel):
+    items: List[SearchHit] = []
+    next_cursor: Optional[str] = None
+
+class PaperListItem(BaseModel):
+    """論文列表項目：只包含以 fields 參數要求的欄位（預設不含摘要等長文本）"""
+    id: int
+    title: Optional[str] = None
+    authors: Optional[List[str]] = None
+    journal: Optional[str] = None
+    year: Optional[int] = None
+    abstract: Optional[str] = None
+    file_path: Optional[str] = None
+    created_at: Optional[datetime] = None
+    summary: Optional[str] = None
+    keywords: Optional[List[str]] = None
+    topic: Optional[str] = None
+    uploader_id: Optional[int] = None
+    uploader_name: Optional[str] = None
+
+class PaperListPage(BaseModel):
+    items: List[PaperListItem] = []
+    next_cursor: Optional[str] = None
+    # 只在第一頁（未帶游標）回傳；total_exact 為 False 時為估計值
+    total_estimate: Optional[int] = None
+    total_exact: Optional[bool] = None
+
 class PaperResponse(PaperBase):
     id: int
     file_path: Optional[str] = None
@@ -80,3 +118,8 @@ class PaperResponse(PaperBase):
 
     class Config:
         from_attributes = True
+
+class PaperTextResponse(BaseModel):
+    paper_id: int
+    text: str
+    page_offsets: List[int] = []
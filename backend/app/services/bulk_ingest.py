@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from ..core.config import settings
+from ..db.session import SessionLocal
+from .paper_store import create_paper, find_papers_by_hashes
+from .search_index import search_index
+from .keyword_extraction import keyword_extractor
+from .semantic_search import semantic_search
+from .upload_store import save_stream
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+
+@dataclass
+class BulkReport:
+    """批次匯入結果：成功、重複與失敗的文件，以及處理速度"""
+    processed: List[Tuple[str, int]] = field(default_factory=list)   # (filename, paper_id)
+    duplicates: List[Tuple[str, int]] = field(default_factory=list)  # (filename, paper_id)
+    failures: List[Tuple[str, str]] = field(default_factory=list)    # (filename, error)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def papers_per_minute(self) -> float:
+        return len(self.processed) * 60 / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _supported(name: str) -> bool:
+    base = os.path.basename(name)
+    # 略過 macOS 壓縮時產生的 __MACOSX/._ 檔案
+    return (
+        not base.startswith('.')
+        and '__MACOSX' not in name
+        and os.path.splitext(base)[1].lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+def iter_archive(archive_path: str) -> Iterator[Tuple[str, BinaryIO]]:
+    """逐一串流壓縮檔（zip / tar / tar.gz）中的 PDF 與 DOCX 成員，不解壓整個檔案"""
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not _supported(info.filename):
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, member
+    elif tarfile.is_tarfile(archive_path):
+        # r:* 以串流方式逐一讀取成員
+        with tarfile.open(archive_path, mode="r:*") as archive:
+            for info in archive:
+                if not info.isfile() or not _supported(info.name):
+                    continue
+                member = archive.extractfile(info)
+                if member is None:
+                    continue
+                with member:
+                    yield info.name, member
+    else:
+        raise ValueError("不支援的壓縮檔格式，僅支援 zip 與 tar")
+
+
+def store_archive(archive_path: str, report: BulkReport) -> List[Tuple[str, str, str]]:
+    """將壓縮檔成員以內容雜湊保存，回傳 (file_path, filename, content_hash) 列表
+
+    單一成員失敗（例如超過大小上限）只記錄於 report，不中止整批。
+    """
+    stored = []
+    for name, member in iter_archive(archive_path):
+        try:
+            file_path, content_hash = save_stream(member, name)
+            stored.append((file_path, name, content_hash))
+        except Exception as e:
+            logger.warning(f"保存壓縮檔成員失敗 {name}: {str(e)}")
+            report.failures.append((name, str(e)))
+    return stored
+
+
+def collect_files(paths: List[str], report: BulkReport) -> List[Tuple[str, str, str]]:
+    """收集路徑中的文件（壓縮檔、目錄或單一文件）並以內容雜湊保存"""
+    stored = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    stored.extend(_store_path(os.path.join(root, name), report))
+        else:
+            stored.extend(_store_path(path, report))
+    return stored
+
+
+def _store_path(path: str, report: BulkReport) -> List[Tuple[str, str, str]]:
+    if path.lower().endswith(ARCHIVE_EXTENSIONS):
+        try:
+            return store_archive(path, report)
+        except Exception as e:
+            report.failures.append((path, str(e)))
+            return []
+    if _supported(path):
+        return _store_file(path, report)
+    return []
+
+
+def _store_file(path: str, report: BulkReport) -> List[Tuple[str, str, str]]:
+    try:
+        with open(path, "rb") as stream:
+            file_path, content_hash = save_stream(stream, path)
+        return [(file_path, path, content_hash)]
+    except Exception as e:
+        report.failures.append((path, str(e)))
+        return []
+
+
+def skip_duplicates(
+    files: List[Tuple[str, str, str]],
+    report: BulkReport
+) -> List[Tuple[str, str, str]]:
+    """以一次查詢排除已存在的論文及批次內的重複文件"""
+    existing = _lookup_hashes([content_hash for _, _, content_hash in files])
+    seen = set()
+    unique = []
+    for file_path, name, content_hash in files:
+        if content_hash in existing:
+            report.duplicates.append((name, existing[content_hash]))
+        elif content_hash not in seen:
+            seen.add(content_hash)
+            unique.append((file_path, name, content_hash))
+    return unique
+
+
+def _lookup_hashes(hashes: List[str]) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return find_papers_by_hashes(db, hashes)
+    finally:
+        db.close()
+
+
+def _save_batch(
+    batch: List[Tuple[str, str, str, Dict[str, Any]]],
+    uploader_id: Optional[int],
+    report: BulkReport
+):
+    """在單一交易中寫入一批論文並建立全文與向量索引，失敗時逐筆重試以找出問題文件"""
+    db = SessionLocal()
+    try:
+        try:
+            papers = [
+                (name, create_paper(db, paper_data, file_path, uploader_id, content_hash))
+                for file_path, name, content_hash, paper_data in batch
+            ]
+            db.commit()
+            saved = [(name, paper.id) for name, paper in papers]
+        except Exception as e:
+            db.rollback()
+            if len(batch) == 1:
+                report.failures.append((batch[0][1], str(e)))
+                return
+            logger.warning(f"批次寫入失敗，改為逐筆寫入: {str(e)}")
+            saved = None
+    finally:
+        db.close()
+
+    if saved is not None:
+        report.processed.extend(saved)
+        search_index.index_papers(paper_id for _, paper_id in saved)
+        semantic_search.index_papers(paper_id for _, paper_id in saved)
+        keyword_extractor.add_papers(paper_id for _, paper_id in saved)
+        return
+    for item in batch:
+        _save_batch([item], uploader_id, report)
+
+
+async def ingest_files(
+    files: List[Tuple[str, str, str]],
+    processor,
+    uploader_id: Optional[int] = None,
+    concurrency: int = settings.BULK_INGEST_CONCURRENCY,
+    batch_size: int = settings.BULK_INGEST_BATCH_SIZE,
+    report: Optional[BulkReport] = None,
+) -> BulkReport:
+    """並行處理文件（文本提取於進程池、LLM 呼叫受 concurrency 限制），並分批寫入資料庫"""
+    report = report or BulkReport()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    pending: List[Tuple[str, str, str, Dict[str, Any]]] = []
+    lock = asyncio.Lock()
+
+    async def flush():
+        batch = pending[:]
+        pending.clear()
+        if batch:
+            await asyncio.to_thread(_save_batch, batch, uploader_id, report)
+            logger.info(
+                f"已匯入 {len(report.processed)} 篇，失敗 {len(report.failures)} 篇，"
+                f"{report.papers_per_minute:.1f} 篇/分鐘"
+            )
+
+    async def handle(file_path: str, name: str, content_hash: str):
+        try:
+            async with semaphore:
+                paper_data = await processor.process_paper(file_path, content_hash=content_hash)
+        except Exception as e:
+            logger.warning(f"處理文件失敗 {name}: {str(e)}")
+            report.failures.append((name, str(e)))
+            return
+        async with lock:
+            pending.append((file_path, name, content_hash, paper_data))
+            if len(pending) >= batch_size:
+                await flush()
+
+    await asyncio.gather(*(handle(*f) for f in files))
+    async with lock:
+        await flush()
+    report.finished_at = time.monotonic()
+    return report
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..db.session import SessionLocal
+from .pagination import keyset_page
+from .search_index import SearchIndex, search_index
+from .semantic_search import SemanticSearch, semantic_search
+
+logger = logging.getLogger(__name__)
+
+Hit = Tuple[int, float]
+
+SEARCH_MODES = ("lexical", "semantic", "hybrid")
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[Hit]],
+    weights: Dict[str, float],
+    k: int = 60,
+) -> List[Hit]:
+    """以 reciprocal rank fusion 合併多個排序：score = Σ weight / (k + rank)"""
+    fused: Dict[int, float] = {}
+    for name, hits in rankings.items():
+        weight = weights.get(name, 1.0)
+        if weight <= 0:
+            continue
+        for rank, (paper_id, _) in enumerate(hits, start=1):
+            fused[paper_id] = fused.get(paper_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda hit: (-hit[1], -hit[0]))
+
+
+class HybridSearch:
+    """論文搜尋的查詢路徑：全文（lexical）、語意（semantic）或兩者融合（hybrid）
+
+    hybrid 模式在背景執行緒中同時執行全文索引查詢與向量 ANN 查詢，各取前
+    candidates 筆以 RRF 融合後分頁。任一路徑失敗時以另一路徑的結果回傳。
+    每個階段的耗時記錄在 timings（毫秒）中，供端點輸出至回應標頭。
+    全文索引查詢在執行緒中使用自己的同步 session，不佔用呼叫端的連線。
+    """
+
+    def __init__(
+        self,
+        lexical: SearchIndex = search_index,
+        semantic: SemanticSearch = semantic_search,
+        candidates: int = settings.HYBRID_CANDIDATES,
+        rrf_k: int = settings.HYBRID_RRF_K,
+        lexical_weight: float = settings.HYBRID_LEXICAL_WEIGHT,
+        semantic_weight: float = settings.HYBRID_SEMANTIC_WEIGHT,
+    ):
+        self.lexical = lexical
+        self.semantic = semantic
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.lexical_weight = lexical_weight
+        self.semantic_weight = semantic_weight
+
+    @staticmethod
+    def _timed(name: str, timings: Dict[str, float], fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timings[name] = (time.perf_counter() - start) * 1000
+
+    def _lexical_search(self, query: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[Hit], Optional[str]]:
+        db = SessionLocal()
+        try:
+            return self.lexical.search(db, query, limit, cursor)
+        finally:
+            db.close()
+
+    def _lexical_candidates(self, query: str) -> List[Hit]:
+        try:
+            return self._lexical_search(query, self.candidates)[0]
+        except Exception as e:
+            logger.error(f"全文搜尋時發生錯誤: {str(e)}", exc_info=True)
+            return []
+
+    def _semantic_candidates(self, query: str) -> List[Hit]:
+        try:
+            return self.semantic.search(query, self.candidates)
+        except Exception as e:
+            logger.error(f"語意搜尋時發生錯誤: {str(e)}", exc_info=True)
+            return []
+
+    async def search(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+        semantic_weight: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> Tuple[List[Hit], Optional[str]]:
+        """回傳 ([(paper_id, score)], 下一頁游標)，游標格式錯誤時拋出 ValueError"""
+        timings = {} if timings is None else timings
+
+        if mode == "lexical":
+            # 全文模式直接使用索引的 keyset 分頁，不受 candidates 限制
+            return await asyncio.to_thread(
+                self._timed, "lexical", timings, self._lexical_search, query, limit, cursor
+            )
+
+        if mode == "semantic":
+            hits = await asyncio.to_thread(
+                self._timed, "semantic", timings, self._semantic_candidates, query
+            )
+            return keyset_page(hits, limit, cursor)
+
+        lexical_hits, semantic_hits = await asyncio.gather(
+            asyncio.to_thread(self._timed, "lexical", timings, self._lexical_candidates, query),
+            asyncio.to_thread(self._timed, "semantic", timings, self._semantic_candidates, query),
+        )
+        start = time.perf_counter()
+        fused = reciprocal_rank_fusion(
+            {"lexical": lexical_hits, "semantic": semantic_hits},
+            {
+                "lexical": self.lexical_weight if lexical_weight is None else lexical_weight,
+                "semantic": self.semantic_weight if semantic_weight is None else semantic_weight,
+            },
+            self.rrf_k,
+        )
+        page = keyset_page(fused, limit, cursor)
+        timings["fusion"] = (time.perf_counter() - start) * 1000
+        return page
+
+
+hybrid_search = HybridSearch()
@@ -0,0 +1,325 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, and_
+
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.ingest_job import IngestJob
+from .paper_store import create_paper, find_paper_by_hash, find_papers_by_hashes
+from .search_index import search_index
+from .keyword_extraction import keyword_extractor
+from .semantic_search import semantic_search
+
+# 設置日誌
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IngestQueue:
+    """以資料庫 ingest_jobs 表為佇列的論文處理 worker pool
+
+    上傳端點只負責寫入工作記錄並立即回傳 job id，實際的文本提取與 LLM
+    處理由背景 worker 執行。工作狀態保存在資料庫中，服務重啟或 worker
+    中斷後，逾時未更新的 running 工作會被重新領取；處理期間每
+    heartbeat_interval 秒更新一次 updated_at，單一階段耗時再久也不會被視為中斷。
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.INGEST_WORKERS,
+        poll_interval: float = settings.INGEST_POLL_INTERVAL,
+        stale_after: int = settings.INGEST_STALE_SECONDS,
+        max_attempts: int = settings.INGEST_MAX_ATTEMPTS,
+        heartbeat_interval: float = settings.INGEST_HEARTBEAT_SECONDS,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.heartbeat_interval = heartbeat_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._processor = None
+
+    @property
+    def processor(self):
+        if self._processor is None:
+            from .paper_processor import PaperProcessor
+            self._processor = PaperProcessor()
+        return self._processor
+
+    def enqueue(
+        self,
+        db,
+        file_path: str,
+        filename: str,
+        uploader_id: Optional[int] = None,
+        content_hash: Optional[str] = None,
+    ) -> IngestJob:
+        """新增一筆待處理工作"""
+        return self.enqueue_many(db, [(file_path, filename, content_hash)], uploader_id)[0]
+
+    def enqueue_many(
+        self,
+        db,
+        files: List[Tuple[str, str, Optional[str]]],
+        uploader_id: Optional[int] = None,
+    ) -> List[IngestJob]:
+        """批次新增待處理工作，files 為 (file_path, filename, content_hash) 列表
+
+        相同內容的文件若已有論文記錄，直接建立已完成的工作並指向該論文；
+        若已在佇列中處理（或同一批次中重複出現），則回傳既有工作，不會重複
+        執行 process_paper。重複判斷各只需一次查詢，所有工作在同一交易中寫入。
+        """
+        hashes = {content_hash for _, _, content_hash in files if content_hash}
+        in_flight: Dict[str, IngestJob] = {}
+        if hashes:
+            in_flight = {
+                job.content_hash: job
+                for job in db.query(IngestJob).filter(
+                    IngestJob.content_hash.in_(hashes),
+                    IngestJob.status.in_(("pending", "running")),
+                )
+            }
+        existing = find_papers_by_hashes(db, hashes)
+
+        jobs: List[IngestJob] = []
+        new_jobs: List[IngestJob] = []
+        for file_path, filename, content_hash in files:
+            if content_hash in in_flight:
+                jobs.append(in_flight[content_hash])
+                continue
+
+            job = IngestJob(
+                filename=filename,
+                file_path=file_path,
+                content_hash=content_hash,
+                status="pending",
+                stage="queued",
+                progress=0,
+                uploader_id=uploader_id,
+            )
+            if content_hash in existing:
+                job.status = "done"
+                job.stage = "duplicate"
+                job.progress = 100
+                job.paper_id = existing[content_hash]
+                logger.info(f"重複上傳的文件，沿用論文 {job.paper_id}: {filename}")
+            elif content_hash:
+                in_flight[content_hash] = job
+
+            db.add(job)
+            jobs.append(job)
+            new_jobs.append(job)
+
+        db.commit()
+        for job in new_jobs:
+            db.refresh(job)
+        if self._wakeup is not None and any(job.status == "pending" for job in new_jobs):
+            self._wakeup.set()
+        return jobs
+
+    async def start(self):
+        """啟動背景 worker"""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        for n in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(n)))
+        logger.info(f"論文處理佇列已啟動，worker 數量: {self.workers}")
+
+    async def stop(self):
+        """停止背景 worker，執行中的工作會在下次啟動時重新領取"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("論文處理佇列已停止")
+
+    async def _worker(self, n: int):
+        while True:
+            try:
+                job_id = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"worker {n} 領取工作時發生錯誤: {str(e)}", exc_info=True)
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job_id)
+
+    def _claimable(self):
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        return or_(
+            IngestJob.status == "pending",
+            and_(IngestJob.status == "running", IngestJob.updated_at < stale_before),
+        )
+
+    def _claim(self) -> Optional[int]:
+        """以條件更新領取最舊的一筆工作，避免多個 worker 重複處理"""
+        db = SessionLocal()
+        try:
+            while True:
+                job = (
+                    db.query(IngestJob)
+                    .filter(self._claimable())
+                    .order_by(IngestJob.id)
+                    .first()
+                )
+                if job is None:
+                    return None
+
+                if job.attempts >= self.max_attempts:
+                    job.status = "failed"
+                    job.error = job.error or "超過最大重試次數"
+                    db.commit()
+                    continue
+
+                claimed = (
+                    db.query(IngestJob)
+                    .filter(IngestJob.id == job.id, self._claimable())
+                    .update(
+                        {
+                            IngestJob.status: "running",
+                            IngestJob.stage: "queued",
+                            IngestJob.progress: 0,
+                            IngestJob.attempts: IngestJob.attempts + 1,
+                            IngestJob.updated_at: datetime.utcnow(),
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    return job.id
+        finally:
+            db.close()
+
+    def _update(self, job_id: int, **values):
+        db = SessionLocal()
+        try:
+            values["updated_at"] = datetime.utcnow()
+            db.query(IngestJob).filter(IngestJob.id == job_id).update(
+                values, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _touch(self, job_id: int):
+        """更新執行中工作的 updated_at，避免被其他 worker 視為中斷而重新領取"""
+        db = SessionLocal()
+        try:
+            db.query(IngestJob).filter(IngestJob.id == job_id, IngestJob.status == "running").update(
+                {IngestJob.updated_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self._touch, job_id)
+            except Exception as e:
+                logger.warning(f"更新工作 {job_id} 的心跳時發生錯誤: {str(e)}")
+
+    def _save(self, job_id: int, paper_data: dict):
+        """在同一交易中寫入論文並標記工作完成"""
+        db = SessionLocal()
+        try:
+            job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+            paper = create_paper(db, paper_data, job.file_path, job.uploader_id, job.content_hash)
+            job.paper_id = paper.id
+            job.status = "done"
+            job.stage = "done"
+            job.progress = 100
+            job.error = None
+            db.commit()
+            return paper.id
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _run(self, job_id: int):
+        job = await asyncio.to_thread(self._get, job_id)
+        logger.info(f"開始處理工作 {job_id}: {job.filename}")
+
+        async def on_stage(stage: str, progress: int):
+            await asyncio.to_thread(self._update, job_id, stage=stage, progress=progress)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            if job.content_hash:
+                paper_id = await asyncio.to_thread(self._find_duplicate, job.content_hash)
+                if paper_id:
+                    await asyncio.to_thread(
+                        self._update, job_id,
+                        status="done", stage="duplicate", progress=100, paper_id=paper_id,
+                    )
+                    logger.info(f"工作 {job_id} 的文件已存在，沿用論文 {paper_id}")
+                    return
+
+            paper_data = await self.processor.process_paper(
+                job.file_path, on_stage=on_stage, content_hash=job.content_hash
+            )
+            await on_stage("saving", 95)
+            paper_id = await asyncio.to_thread(self._save, job_id, paper_data)
+            await self._index(paper_id)
+            logger.info(f"工作 {job_id} 完成，論文 id: {paper_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"處理工作 {job_id} 時發生錯誤: {str(e)}", exc_info=True)
+            status = "failed" if job.attempts >= self.max_attempts else "pending"
+            await asyncio.to_thread(self._update, job_id, status=status, error=str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def _index(self, paper_id: int):
+        """論文寫入後更新全文索引、向量索引與關鍵詞統計
+
+        論文與工作狀態已提交，索引失敗時只記錄錯誤、不讓工作重試（重試會因內容
+        重複而直接完成，論文仍不會被索引），可再以 db/rebuild_* 命令重建。
+        """
+        steps = (
+            ("全文搜尋索引", search_index.index_paper),
+            ("語意搜尋索引", semantic_search.index_paper),
+            ("關鍵詞統計", lambda paper_id: keyword_extractor.add_papers([paper_id])),
+        )
+        for name, index in steps:
+            try:
+                await asyncio.to_thread(index, paper_id)
+            except Exception as e:
+                logger.error(f"更新論文 {paper_id} 的{name}時發生錯誤: {str(e)}", exc_info=True)
+
+    def _find_duplicate(self, content_hash: str) -> Optional[int]:
+        db = SessionLocal()
+        try:
+            return find_paper_by_hash(db, content_hash)
+        finally:
+            db.close()
+
+    def _get(self, job_id: int) -> IngestJob:
+        db = SessionLocal()
+        try:
+            job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+            db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+
+ingest_queue = IngestQueue()
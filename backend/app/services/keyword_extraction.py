@@ -0,0 +1,275 @@
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, CountVectorizer
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.paper import Paper, paper_keyword
+from ..models.term_stat import DOCUMENT_COUNT_TERM, TermStat
+from .paper_store import link_keywords, normalize_keywords
+from .text_analysis import STOP_WORDS
+from .text_store import load_text
+
+logger = logging.getLogger(__name__)
+
+# 英文詞彙（可含連字號，例如 "pre-trained"）；其他符號與數字會斷開片語
+_TOKEN_RE = re.compile(r"(?P<word>[a-z][a-z0-9]*(?:-[a-z0-9]+)*)|[^\sa-z]+")
+_STOP_WORDS = ENGLISH_STOP_WORDS | STOP_WORDS | frozenset("""
+et al also fig figure table eq section paper use used based via
+""".split())
+# 一次查詢 / 寫入的詞彙數
+_CHUNK_SIZE = 1000
+
+
+def _chunks(items: Sequence, size: int = _CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class KeywordExtractor:
+    """以 TF-IDF 從全文提取關鍵詞（單字與 n-gram 片語）
+
+    文件頻率保存於 term_stats，每篇論文寫入後增量更新，查詢時只讀取該文件
+    候選詞的統計。片語在停用詞與標點處斷開，多字片語需在文件中出現至少兩次
+    才成為候選詞；分數為 (1 + log tf) * idf * sqrt(字數)，讓片語優先於其組成的單字，
+    已選詞彙包含的較短詞彙不再重複選出。
+    """
+
+    def __init__(
+        self,
+        max_ngram: int = settings.KEYWORD_MAX_NGRAM,
+        max_chars: int = settings.KEYWORD_MAX_CHARS,
+        max_candidates: int = settings.KEYWORD_MAX_CANDIDATES,
+    ):
+        self.max_ngram = max_ngram
+        self.max_chars = max_chars
+        self.max_candidates = max_candidates
+
+    def candidates(self, text: str) -> Counter:
+        """文件中的候選詞與詞頻"""
+        counts: Counter = Counter()
+        run: List[str] = []
+        for match in _TOKEN_RE.finditer((text or "")[:self.max_chars].lower()):
+            token = match.group("word")
+            if token and len(token) > 2 and token not in _STOP_WORDS:
+                run.append(token)
+                continue
+            self._add_ngrams(run, counts)
+            run = []
+        self._add_ngrams(run, counts)
+        return Counter({term: count for term, count in counts.items() if count > 1 or " " not in term})
+
+    def _add_ngrams(self, run: List[str], counts: Counter):
+        for n in range(1, min(self.max_ngram, len(run)) + 1):
+            for start in range(len(run) - n + 1):
+                term = " ".join(run[start:start + n])
+                # 與 keywords.word 的長度上限相同
+                if len(term) <= 100:
+                    counts[term] += 1
+
+    def _analyzer(self, text: str) -> List[str]:
+        return list(self.candidates(text).elements())
+
+    @staticmethod
+    def document_frequencies(db: Session, terms: Sequence[str]) -> Tuple[int, Dict[str, int]]:
+        """讀取 (已統計的文件數, {詞彙: 文件頻率})"""
+        frequencies: Dict[str, int] = {}
+        for chunk in _chunks(list(terms) + [DOCUMENT_COUNT_TERM]):
+            frequencies.update(db.execute(
+                select(TermStat.term, TermStat.document_count).where(TermStat.term.in_(chunk))
+            ).all())
+        return frequencies.pop(DOCUMENT_COUNT_TERM, 0), frequencies
+
+    @staticmethod
+    def _select(terms: Sequence[str], scores: np.ndarray, k: int) -> List[str]:
+        selected: List[str] = []
+        for index in np.argsort(-scores, kind="stable"):
+            term = f" {terms[index]} "
+            if any(term in other or other in term for other in selected):
+                continue
+            selected.append(term)
+            if len(selected) == k:
+                break
+        return [term.strip() for term in selected]
+
+    @staticmethod
+    def _scores(terms: Sequence[str], tf: np.ndarray, df: np.ndarray, documents: int) -> np.ndarray:
+        # 平滑 IDF（同 scikit-learn），語料為空時退化為詞頻排序
+        idf = np.log((1 + documents) / (1 + df)) + 1
+        words = np.fromiter((term.count(" ") + 1 for term in terms), dtype=np.float64, count=len(terms))
+        return (1 + np.log(tf)) * idf * np.sqrt(words)
+
+    def extract(self, text: str, k: int = settings.KEYWORD_COUNT, db: Optional[Session] = None) -> List[str]:
+        """提取單篇文件的前 k 個關鍵詞"""
+        counts = self.candidates(text)
+        if not counts:
+            return []
+        terms, tf = zip(*counts.most_common(self.max_candidates))
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            documents, frequencies = self.document_frequencies(db, terms)
+        finally:
+            if own_session:
+                db.close()
+        df = np.array([frequencies.get(term, 0) for term in terms], dtype=np.float64)
+        return self._select(terms, self._scores(terms, np.array(tf, dtype=np.float64), df, documents), k)
+
+    def extract_batch(
+        self,
+        db: Session,
+        texts: Sequence[str],
+        k: int = settings.KEYWORD_COUNT,
+        counted: bool = False,
+    ) -> List[List[str]]:
+        """批次提取關鍵詞：以 CountVectorizer 建立詞頻矩陣，每篇的分數以向量運算計算
+
+        counted=False 時，批次內的文件頻率會與已保存的統計合併（文件尚未納入統計）。
+        """
+        if not texts:
+            return []
+        vectorizer = CountVectorizer(analyzer=self._analyzer)
+        try:
+            matrix = vectorizer.fit_transform(texts).tocsr()
+        except ValueError:
+            # 所有文件都沒有候選詞
+            return [[] for _ in texts]
+        terms = vectorizer.get_feature_names_out()
+        documents, frequencies = self.document_frequencies(db, terms)
+        df = np.array([frequencies.get(term, 0) for term in terms], dtype=np.float64)
+        if not counted:
+            df += np.asarray((matrix > 0).sum(axis=0)).ravel()
+            documents += len(texts)
+
+        keywords = []
+        for row in range(matrix.shape[0]):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            columns = matrix.indices[start:end]
+            row_terms = terms[columns]
+            scores = self._scores(row_terms, matrix.data[start:end].astype(np.float64), df[columns], documents)
+            keywords.append(self._select(row_terms, scores, k))
+        return keywords
+
+    def add_documents(self, db: Session, texts: Iterable[str]) -> int:
+        """將文件納入文件頻率統計（不提交交易），回傳文件數"""
+        return self._update_counts(db, texts, 1)
+
+    def remove_documents(self, db: Session, texts: Iterable[str]) -> int:
+        """自文件頻率統計中扣除已刪除的文件（不提交交易），回傳文件數"""
+        return self._update_counts(db, texts, -1)
+
+    def _update_counts(self, db: Session, texts: Iterable[str], sign: int) -> int:
+        frequencies: Counter = Counter()
+        documents = 0
+        for text in texts:
+            frequencies.update(self.candidates(text).keys())
+            documents += 1
+        if not documents:
+            return 0
+        frequencies[DOCUMENT_COUNT_TERM] = documents
+
+        dialect = db.get_bind().dialect.name
+        # 依詞彙排序寫入，並行更新時鎖定順序一致，避免死結
+        rows = [{"term": term, "document_count": sign * count} for term, count in sorted(frequencies.items())]
+        for chunk in _chunks(rows):
+            if dialect in ("postgresql", "sqlite"):
+                dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                statement = dialect_insert(TermStat).values(chunk)
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=[TermStat.term],
+                    set_={"document_count": TermStat.document_count + statement.excluded.document_count},
+                ))
+            else:
+                self._add_counts(db, chunk)
+            if sign < 0:
+                # 文件頻率降為 0 的詞彙不再保留（統計中原本缺少的詞彙也一併清除）
+                db.execute(delete(TermStat).where(
+                    TermStat.term.in_([row["term"] for row in chunk]), TermStat.document_count <= 0
+                ))
+        return documents
+
+    @staticmethod
+    def _add_counts(db: Session, rows: List[Dict[str, int]]):
+        """不支援 ON CONFLICT 的資料庫：查詢已存在的詞彙，已存在的累加，其餘新增"""
+        existing = set(db.execute(
+            select(TermStat.term).where(TermStat.term.in_([row["term"] for row in rows]))
+        ).scalars())
+        updates = [{"_term": row["term"], "_count": row["document_count"]} for row in rows if row["term"] in existing]
+        if updates:
+            table = TermStat.__table__
+            db.execute(
+                update(table).where(table.c.term == bindparam("_term"))
+                .values(document_count=table.c.document_count + bindparam("_count")),
+                updates
+            )
+        inserts = [row for row in rows if row["term"] not in existing]
+        if inserts:
+            db.execute(insert(TermStat.__table__), inserts)
+
+    @staticmethod
+    def document_text(title: Optional[str], abstract: Optional[str], content_hash: Optional[str]) -> str:
+        """論文保存的全文；沒有全文時使用標題與摘要"""
+        stored = load_text(content_hash) if content_hash else None
+        return stored.text if stored else f"{title or ''}\n{abstract or ''}"
+
+    @classmethod
+    def load_texts(cls, db: Session, paper_ids: Iterable[int]) -> Dict[int, str]:
+        """讀取多篇論文的全文（見 document_text）"""
+        rows = db.query(Paper.id, Paper.title, Paper.abstract, Paper.content_hash).filter(Paper.id.in_(list(paper_ids)))
+        return {
+            paper_id: cls.document_text(title, abstract, content_hash)
+            for paper_id, title, abstract, content_hash in rows
+        }
+
+    def add_papers(self, paper_ids: Iterable[int]) -> int:
+        """新論文寫入後更新文件頻率統計，失敗時記錄錯誤並回傳 0"""
+        paper_ids = list(paper_ids)
+        db = SessionLocal()
+        try:
+            documents = self.add_documents(db, self.load_texts(db, paper_ids).values())
+            db.commit()
+            return documents
+        except Exception as e:
+            db.rollback()
+            logger.error(f"更新論文 {paper_ids} 的關鍵詞統計時發生錯誤: {str(e)}", exc_info=True)
+            return 0
+        finally:
+            db.close()
+
+    def rebuild(self, batch_size: int = 100, update_keywords: bool = False) -> int:
+        """重新計算所有論文的文件頻率；update_keywords=True 時再以新統計重新提取所有論文的關鍵詞"""
+        db = SessionLocal()
+        try:
+            paper_ids = [paper_id for paper_id, in db.query(Paper.id).order_by(Paper.id)]
+            db.execute(delete(TermStat))
+            for batch in _chunks(paper_ids, batch_size):
+                self.add_documents(db, self.load_texts(db, batch).values())
+            db.commit()
+            logger.info(f"已重新計算 {len(paper_ids)} 篇論文的關鍵詞統計")
+
+            if update_keywords:
+                for batch in _chunks(paper_ids, batch_size):
+                    texts = self.load_texts(db, batch)
+                    papers = db.query(Paper).filter(Paper.id.in_(list(texts))).all()
+                    keywords = dict(zip(texts, self.extract_batch(db, list(texts.values()), counted=True)))
+                    db.execute(delete(paper_keyword).where(paper_keyword.c.paper_id.in_(list(texts))))
+                    for paper in papers:
+                        link_keywords(db, paper, normalize_keywords(keywords[paper.id]))
+                    db.commit()
+                logger.info(f"已重新提取 {len(paper_ids)} 篇論文的關鍵詞")
+            return len(paper_ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+keyword_extractor = KeywordExtractor()
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.llm_cache import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def _sha256(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """行程內所有 CachedLLMClient 共用的命中統計與寫入次數"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def count_put(self) -> int:
+        """記錄一次寫入，回傳累計寫入次數"""
+        with self._lock:
+            self.puts += 1
+            return self.puts
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+llm_cache_stats = CacheStats()
+
+
+class CachedLLMClient:
+    """包裝 OpenAI 客戶端的持久化回應快取
+
+    快取鍵由模型、system prompt、呼叫參數與（已截斷的）輸入文本雜湊組成，
+    條目存放於 llm_cache_entries 表，超過 TTL 視為失效。每 evict_every 次寫入
+    清理一次過期條目，並依 last_used_at 淘汰最久未使用的條目（兩次清理之間
+    條目數最多超出 evict_every 筆）。快取讀寫失敗不影響 LLM 呼叫本身。
+    """
+
+    def __init__(
+        self,
+        openai_client,
+        enabled: bool = settings.LLM_CACHE_ENABLED,
+        ttl_seconds: int = settings.LLM_CACHE_TTL_SECONDS,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        evict_every: int = settings.LLM_CACHE_EVICT_EVERY,
+    ):
+        self.openai_client = openai_client
+        self.enabled = enabled
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self.evict_every = max(1, evict_every)
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        system = [m["content"] for m in messages if m["role"] == "system"]
+        inputs = [_sha256(m["content"]) for m in messages if m["role"] != "system"]
+        return _sha256(json.dumps(
+            {"model": model, "system": system, "params": params, "inputs": inputs},
+            sort_keys=True,
+            ensure_ascii=False,
+        ))
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return llm_cache_stats.stats()
+
+    async def complete(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        """呼叫 chat completion 並回傳文字內容，命中快取時不呼叫 API"""
+        key = self.make_key(model, messages, params) if self.enabled else None
+        if key:
+            cached = await asyncio.to_thread(self._get, key)
+            llm_cache_stats.record(cached is not None)
+            if cached is not None:
+                return cached
+
+        response = await self.openai_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **params
+        )
+        content = response.choices[0].message.content.strip()
+
+        if key:
+            await asyncio.to_thread(self._put, key, model, content)
+        return content
+
+    def _get(self, key: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).first()
+            if entry is None:
+                return None
+            now = datetime.utcnow()
+            if entry.created_at < now - self.ttl:
+                db.delete(entry)
+                db.commit()
+                return None
+            entry.hits += 1
+            entry.last_used_at = now
+            db.commit()
+            return entry.response
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"讀取 LLM 快取時發生錯誤: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def _put(self, key: str, model: str, content: str):
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.merge(LLMCacheEntry(
+                key=key,
+                model=model,
+                response=content,
+                hits=0,
+                created_at=now,
+                last_used_at=now,
+            ))
+            db.commit()
+            if llm_cache_stats.count_put() % self.evict_every == 0:
+                self._evict(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"寫入 LLM 快取時發生錯誤: {str(e)}")
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        """刪除過期條目，並依 LRU 將條目數量控制在 max_entries 以內"""
+        db.query(LLMCacheEntry).filter(
+            LLMCacheEntry.created_at < datetime.utcnow() - self.ttl
+        ).delete(synchronize_session=False)
+        overflow = db.query(LLMCacheEntry).count() - self.max_entries
+        if overflow > 0:
+            stale_keys = (
+                db.query(LLMCacheEntry.key)
+                .order_by(LLMCacheEntry.last_used_at)
+                .limit(overflow)
+                .subquery()
+            )
+            db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.key.in_(stale_keys.select())
+            ).delete(synchronize_session=False)
+        db.commit()
@@ -0,0 +1,254 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# 本地元數據解析：只讀取論文開頭（標題、作者與摘要區塊），單次走訪，所有規則預先編譯
+
+# 開頭區塊的行數上限（遇到引言標題時提前結束）
+FRONT_MATTER_LINES = 80
+# 標題最多合併的行數
+TITLE_MAX_LINES = 3
+
+_ABSTRACT_RE = re.compile(r"^(?:abstract|a\s?b\s?s\s?t\s?r\s?a\s?c\s?t)\b[\s.:—-]*", re.IGNORECASE)
+_INTRODUCTION_RE = re.compile(r"^(?:(?:\d+|[ivx]+)\.?\s*)?introduction\b", re.IGNORECASE)
+_AUTHOR_MARKER_RE = re.compile(r"^(?:authors?|by|written by|contributors)\s*:\s*", re.IGNORECASE)
+_KEYWORDS_RE = re.compile(r"^(?:keywords?|key words|index terms)\s*[:—-]\s*", re.IGNORECASE)
+_KEYWORD_SPLIT_RE = re.compile(r"[,;·]")
+# 姓名：首字母大寫的兩到四個詞，允許縮寫（"J." / "J.-P."）與連字號姓氏，後面可帶上標標記
+_NAME = r"[A-Z][\w'’-]*\.?(?:\s+[A-Z][\w'’-]*\.?){1,3}[\d*†‡§,]*"
+_AUTHOR_LINE_RE = re.compile(rf"^{_NAME}(?:\s*(?:,|;|&|\band\b)\s*{_NAME})*(?:\s*,?\s*et al\.?)?$")
+_AUTHOR_SPLIT_RE = re.compile(r"\s*(?:,|;|&|\band\b)\s*")
+_AUTHOR_MARKS_RE = re.compile(r"[\d*†‡§]+$|\s*et al\.?$")
+_VENUE_RE = re.compile(r"\b(?:journal|conference|proceedings|transactions|symposium|workshop)\b", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+# 識別碼只在第一頁範圍內尋找（參考文獻中的 arXiv / DOI 屬於其他論文）
+IDENTIFIER_CHARS = 5000
+_DOI_RE = re.compile(r"\b10\.\d{4,9}/[^\s\"<>]+", re.IGNORECASE)
+_ARXIV_RE = re.compile(r"\barXiv:\s?(?P<yy>\d{2})(?P<mm>\d{2})\.\d{4,5}(?:v\d+)?", re.IGNORECASE)
+# 文書軟體自動填入、不是論文標題的 PDF title
+_JUNK_TITLE_RE = re.compile(r"^(?:microsoft word|untitled|title)\b|\.(?:pdf|docx?|tex|dvi)$", re.IGNORECASE)
+_NORMALIZE_RE = re.compile(r"[\W_]+")
+
+# 機構、信箱等不會是作者的行：機構用語、公司 / 組織名稱與字尾
+_AFFILIATION_RE = re.compile(
+    r"@|\b(?:universit(?:y|ies|ät|é|à)|institute|department|faculty|laboratory|labs?|research|school|college|"
+    r"academy|cent(?:er|re)|group|hospital|foundation|corporation|corp|company|inc|llc|ltd|limited|gmbh|"
+    r"google|microsoft|facebook|amazon|ibm|nvidia|openai|deepmind|brain|baidu|alibaba|tencent|huawei)\b",
+    re.IGNORECASE
+)
+# 區分大小寫的機構縮寫，以及行尾的國家、城市或州縮寫（例如 "Redmond, WA"、"Beijing, China"）
+_ORGANIZATION_RE = re.compile(r"\b(?:AI|NLP|ML|MIT|CMU|UCLA|KAIST|ETH|EPFL|INRIA|CNRS|A\*STAR)\b")
+_LOCATION_RE = re.compile(
+    r"(?:,\s*[A-Z]{2}(?:\s+\d{5})?|\b(?:USA|U\.S\.A|UK|United States|United Kingdom|China|Taiwan|Japan|Korea|"
+    r"Singapore|Germany|France|Canada|Australia|India|Israel|Switzerland|Netherlands|Italy|Spain|Sweden|"
+    r"Hong Kong|Beijing|Shanghai|Shenzhen|Taipei|Hsinchu|Tokyo|Seoul|London|Paris|Zurich|Toronto|Montreal|"
+    r"Seattle|Redmond|Mountain View|Palo Alto|Menlo Park|Pittsburgh|New York))\.?$"
+)
+
+
+def _is_affiliation(line: str) -> bool:
+    return bool(_AFFILIATION_RE.search(line) or _ORGANIZATION_RE.search(line) or _LOCATION_RE.search(line))
+
+
+def _split_authors(line: str) -> List[str]:
+    authors = []
+    for part in _AUTHOR_SPLIT_RE.split(line):
+        name = _AUTHOR_MARKS_RE.sub("", part.strip()).strip()
+        if name and name.lower() != "et al":
+            authors.append(name)
+    return authors
+
+
+def parse_front_matter(text: str, title_hint: Optional[str] = None) -> Dict[str, Any]:
+    """從論文開頭解析標題、作者、期刊 / 會議、年份與關鍵詞
+
+    年份為四位數字串，找不到時為空字串（寫入時由 paper_store.normalize_year 轉為整數或 None）。
+    title_hint 為版面分析找到的標題（例如 PDF 第一頁最大字體的文字），
+    提供時優先使用。期刊與年份取開頭區塊中第一個符合的行，不走訪全文。
+    """
+    metadata: Dict[str, Any] = {
+        'title': title_hint.strip() if title_hint else '',
+        'authors': [],
+        'journal': '',
+        'year': '',
+        'keywords': [],
+    }
+    title_lines: List[str] = []
+    # 標題在第一個空行或作者標記前結束；摘要標題之後不再尋找作者
+    in_title = not metadata['title']
+    in_header = True
+
+    for count, raw in enumerate((text or "").split("\n", FRONT_MATTER_LINES)):
+        if count >= FRONT_MATTER_LINES:
+            break
+        line = raw.strip()
+        if not line:
+            if title_lines:
+                in_title = False
+            continue
+        if _INTRODUCTION_RE.match(line):
+            break
+        if _ARXIV_RE.match(line):
+            # 預印本頁邊的 arXiv 標記，由 find_identifiers 處理
+            continue
+        if not in_title and not title_lines and line in metadata['title']:
+            # 版面分析已取得的標題行
+            continue
+
+        marker = _AUTHOR_MARKER_RE.match(line)
+        # 標題後直接接多位作者（沒有空行）時，作者行結束標題
+        authors_line = bool(_AUTHOR_LINE_RE.match(line)) and not _is_affiliation(line)
+        if in_title and title_lines and authors_line and _AUTHOR_SPLIT_RE.search(line):
+            in_title = False
+        if in_title and not marker:
+            title_lines.append(line)
+            if len(title_lines) >= TITLE_MAX_LINES:
+                in_title = False
+            continue
+        in_title = False
+
+        if in_header:
+            if _ABSTRACT_RE.match(line):
+                in_header = False
+            elif marker:
+                metadata['authors'].extend(_split_authors(line[marker.end():]))
+                continue
+            elif authors_line:
+                metadata['authors'].extend(_split_authors(line))
+                continue
+
+        keywords = _KEYWORDS_RE.match(line)
+        if keywords and not metadata['keywords']:
+            metadata['keywords'] = [
+                word.strip().rstrip('.') for word in _KEYWORD_SPLIT_RE.split(line[keywords.end():]) if word.strip()
+            ]
+            continue
+        if not metadata['journal'] and _VENUE_RE.search(line):
+            metadata['journal'] = line[:200]
+        if not metadata['year']:
+            year = _YEAR_RE.search(line)
+            if year:
+                metadata['year'] = year.group()
+
+    if title_lines:
+        metadata['title'] = ' '.join(title_lines)
+    metadata['authors'] = list(dict.fromkeys(metadata['authors']))
+    return metadata
+
+
+def find_identifiers(text: str) -> Dict[str, str]:
+    """第一頁中的 DOI 與 arXiv 編號（arXiv 編號的 YYMM 可推得年份）"""
+    head = (text or "")[:IDENTIFIER_CHARS]
+    identifiers = {}
+    doi = _DOI_RE.search(head)
+    if doi:
+        identifiers['doi'] = doi.group().rstrip('.,;')
+    arxiv = _ARXIV_RE.search(head)
+    if arxiv and 1 <= int(arxiv.group('mm')) <= 12:
+        identifiers['arxiv'] = arxiv.group()
+        identifiers['arxiv_year'] = f"20{arxiv.group('yy')}"
+    return identifiers
+
+
+def _normalized(value: str) -> str:
+    return _NORMALIZE_RE.sub(" ", value.lower()).strip()
+
+
+def _same_title(a: str, b: str) -> bool:
+    a, b = _normalized(a), _normalized(b)
+    if not a or not b:
+        return False
+    shorter, longer = sorted((a, b), key=len)
+    return shorter in longer and len(shorter) >= 0.8 * len(longer)
+
+
+def local_metadata(text: str, pdf_info: Optional[Dict[str, Optional[str]]] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """合併論文開頭解析、PDF 內嵌資訊與識別碼，回傳 (元數據, 各欄位信心分數 0-1)
+
+    pdf_info 為 text_extraction.pdf_front_matter 的結果。多個來源一致時信心較高；
+    只有文字開頭推測的結果信心較低。
+    """
+    pdf_info = pdf_info or {}
+    layout_title = pdf_info.get('layout_title')
+    embedded_title = pdf_info.get('title')
+    if embedded_title and (_JUNK_TITLE_RE.search(embedded_title) or len(embedded_title) < 10):
+        embedded_title = None
+
+    metadata = parse_front_matter(text, layout_title or embedded_title)
+    identifiers = find_identifiers(text)
+    confidence = {'title': 0.0, 'authors': 0.0, 'year': 0.0, 'journal': 0.0}
+
+    title = metadata['title']
+    if not 10 <= len(title) <= 300:
+        confidence['title'] = 0.0
+    elif layout_title and embedded_title and _same_title(layout_title, embedded_title):
+        confidence['title'] = 0.95
+    elif layout_title:
+        confidence['title'] = 0.8
+    elif embedded_title:
+        confidence['title'] = 0.7
+    else:
+        confidence['title'] = 0.5
+
+    embedded_authors = _split_authors(pdf_info.get('author') or '')
+    if metadata['authors'] and set(map(_normalized, embedded_authors)) & set(map(_normalized, metadata['authors'])):
+        confidence['authors'] = 0.9
+    elif metadata['authors']:
+        # 只由文字開頭推測的姓名可能是機構名稱，未經 PDF 內嵌資訊確認時不足以略過 LLM
+        confidence['authors'] = 0.6
+    elif embedded_authors:
+        # PDF 的 author 常是製作文件的人，只作為最後的來源
+        metadata['authors'] = embedded_authors
+        confidence['authors'] = 0.5
+
+    if 'arxiv_year' in identifiers:
+        metadata['year'] = identifiers['arxiv_year']
+        confidence['year'] = 0.9
+    elif metadata['year']:
+        # 出現在期刊 / 會議行中的年份通常是發表年份
+        confidence['year'] = 0.8 if metadata['year'] in metadata['journal'] else 0.6
+
+    if metadata['journal']:
+        confidence['journal'] = 0.7
+    elif 'arxiv' in identifiers:
+        metadata['journal'] = 'arXiv'
+        confidence['journal'] = 0.7
+    if 'doi' in identifiers:
+        metadata['doi'] = identifiers['doi']
+        confidence['journal'] = max(confidence['journal'], 0.5)
+    return metadata, confidence
+
+
+# 決定是否呼叫 LLM 時需要的欄位：整體信心為這些欄位的最小值
+REQUIRED_FIELDS = ('title', 'authors', 'year')
+
+
+def overall_confidence(confidence: Dict[str, float]) -> float:
+    return min(confidence.get(field, 0.0) for field in REQUIRED_FIELDS)
+
+
+class EscalationStats:
+    """本地元數據信心不足、改用 LLM 的次數統計"""
+
+    def __init__(self):
+        self.local = 0
+        self.escalated = 0
+        self._lock = threading.Lock()
+
+    def record(self, escalated: bool):
+        with self._lock:
+            if escalated:
+                self.escalated += 1
+            else:
+                self.local += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.local + self.escalated
+        return {
+            "local": self.local,
+            "escalated": self.escalated,
+            "escalation_rate": self.escalated / total if total else 0.0,
+        }
+
+
+metadata_escalations = EscalationStats()
@@ -0,0 +1,143 @@
+import asyncio
+import gc
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    def __init__(self, loader: Callable[[], Any], unloadable: bool):
+        self.loader = loader
+        self.unloadable = unloadable
+        self.model: Any = None
+        self.loaded = False
+        self.load_seconds: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """延遲載入模型的登錄表
+
+    模型在第一次 get() 時才載入（或由 preload 在背景載入），閒置超過指定時間
+    可卸載以釋放記憶體，並記錄各模型的載入耗時。載入失敗時回傳 None，呼叫端
+    需自行降級處理，與原本的行為一致。
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], unloadable: bool = True):
+        self._entries[name] = _Entry(loader, unloadable)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        if not entry.loaded:
+            with entry.lock:
+                if not entry.loaded:
+                    start = time.monotonic()
+                    try:
+                        logger.info(f"正在加載模型: {name}")
+                        entry.model = entry.loader()
+                        entry.error = None
+                    except Exception as e:
+                        logger.error(f"加載模型 {name} 時發生錯誤: {str(e)}", exc_info=True)
+                        entry.model = None
+                        entry.error = str(e)
+                    entry.load_seconds = time.monotonic() - start
+                    entry.loaded = True
+                    logger.info(f"模型 {name} 加載完成，耗時 {entry.load_seconds:.2f} 秒")
+        entry.last_used = time.monotonic()
+        return entry.model
+
+    async def preload(self, names: Iterable[str]):
+        """在背景執行緒中預先載入模型，不阻塞啟動"""
+        for name in names:
+            if name in self._entries:
+                await asyncio.to_thread(self.get, name)
+            else:
+                logger.warning(f"未註冊的模型: {name}")
+
+    def unload(self, name: str):
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.loaded:
+                entry.model = None
+                entry.loaded = False
+                gc.collect()
+                logger.info(f"已卸載模型: {name}")
+
+    def unload_idle(self, max_idle_seconds: float):
+        """卸載閒置超過 max_idle_seconds 的模型"""
+        now = time.monotonic()
+        for name, entry in self._entries.items():
+            if (
+                entry.unloadable
+                and entry.loaded
+                and entry.model is not None
+                and entry.last_used is not None
+                and now - entry.last_used > max_idle_seconds
+            ):
+                self.unload(name)
+
+    async def reap_idle(self, max_idle_seconds: float, interval: float = 60):
+        """定期卸載閒置模型的背景任務"""
+        while True:
+            await asyncio.sleep(interval)
+            self.unload_idle(max_idle_seconds)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {
+            name: {
+                "loaded": entry.loaded and entry.model is not None,
+                "load_seconds": entry.load_seconds,
+                "idle_seconds": now - entry.last_used if entry.last_used is not None else None,
+                "error": entry.error,
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+def _load_summarizer():
+    from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+    import torch
+
+    # 使用更小的模型
+    model_name = "facebook/bart-base"
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        model_name,
+        low_cpu_mem_usage=True,
+        torch_dtype=torch.float32
+    )
+    return pipeline(
+        "summarization",
+        model=model,
+        tokenizer=tokenizer,
+        device=-1,  # 使用 CPU
+        model_kwargs={
+            "low_cpu_mem_usage": True,
+            "torch_dtype": torch.float32
+        }
+    )
+
+
+def _load_sentence_model():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(
+        'all-MiniLM-L6-v2',
+        device='cpu',
+        cache_folder=os.path.join(os.path.expanduser("~"), ".cache", "sentence_transformers")
+    )
+
+
+model_registry = ModelRegistry()
+model_registry.register("summarizer", _load_summarizer)
+model_registry.register("sentence", _load_sentence_model)
@@ -0,0 +1,92 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """將分頁位置編碼為不透明的游標字串"""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """解碼 encode_cursor 產生的游標，格式錯誤時拋出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("無效的分頁游標") from e
+    if not isinstance(values, dict):
+        raise ValueError("無效的分頁游標")
+    return values
+
+
+def encode_score_cursor(paper_id: int, score: float) -> str:
+    """依相關度排序的結果以 (score, id) 作為分頁鍵"""
+    return encode_cursor({"s": score, "i": paper_id})
+
+
+def decode_score_cursor(cursor: str) -> Tuple[int, float]:
+    """解碼 encode_score_cursor 的游標，回傳 (paper_id, score)"""
+    values = decode_cursor(cursor)
+    try:
+        return int(values["i"]), float(values["s"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("無效的分頁游標") from e
+
+
+def keyset_page(
+    hits: List[Tuple[int, float]],
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[int, float]], Optional[str]]:
+    """對已在記憶體中的 (paper_id, score) 結果依 (score, id) 遞減排序並取出一頁"""
+    hits = sorted(hits, key=lambda hit: (-hit[1], -hit[0]))
+    if cursor:
+        after_id, after_score = decode_score_cursor(cursor)
+        hits = [
+            (paper_id, score) for paper_id, score in hits
+            if score < after_score or (score == after_score and paper_id < after_id)
+        ]
+    if len(hits) > limit:
+        return hits[:limit], encode_score_cursor(*hits[limit - 1])
+    return hits, None
+
+
+def encode_time_cursor(created_at: datetime, paper_id: int) -> str:
+    """依建立時間排序的列表以 (created_at, id) 作為分頁鍵"""
+    return encode_cursor({"t": created_at.isoformat(), "i": paper_id})
+
+
+def decode_time_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解碼 encode_time_cursor 的游標，回傳 (created_at, paper_id)"""
+    values = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(values["t"]), int(values["i"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("無效的分頁游標") from e
+
+
+async def estimate_count(db: AsyncSession, statement: Select, table: str, filtered: bool, cap: int) -> Tuple[int, bool]:
+    """估計查詢結果總數，回傳 (數量, 是否精確)
+
+    PostgreSQL 未篩選時使用統計資訊 pg_class.reltuples，不需掃描整個表；
+    其他情況最多計數 cap 筆，超過時回傳 cap 並標示為不精確。
+    """
+    if not filtered and db.get_bind().dialect.name == "postgresql":
+        estimate = (await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"), {"table": table}
+        )).scalar()
+        # 尚未 ANALYZE 的表 reltuples 為 -1（或 0），改用計數
+        if estimate and estimate > 0:
+            return int(estimate), False
+    limited = statement.order_by(None).limit(cap + 1).subquery()
+    count = (await db.execute(select(func.count()).select_from(limited))).scalar_one()
+    if count > cap:
+        return cap, False
+    return count, True
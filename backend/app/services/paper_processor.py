@@ -1,52 +1,70 @@
-import fitz  # PyMuPDF
 import logging
-from docx import Document
 import os
-from typing import Dict, List, Optional, Tuple, Any
-import nltk
-from nltk.tokenize import sent_tokenize
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-except ImportError:
-    pipeline = None
-    AutoTokenizer = None
-    AutoModelForSeq2SeqLM = None
-    logging.error("Transformers import failed; summarization disabled")
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:
-    SentenceTransformer = None
-    import logging
-    logging.error("SentenceTransformer import failed; similarity and summarization pipelines disabled")
+from typing import Dict, List, Optional, Tuple, Any, Callable, Awaitable
 import numpy as np
-import logging
-import torch
 from ..core.config import settings
 from fastapi import HTTPException
+from pydantic import BaseModel, Field, field_validator
 from openai import AsyncOpenAI
 import json
+import asyncio
+from .stage_graph import Stage, run_stage_graph
+from .llm_cache import CachedLLMClient
+from . import text_extraction
+from .text_store import get_or_extract
+from .summarizer import MapReduceSummarizer
+from .model_registry import model_registry
+from .keyword_extraction import keyword_extractor
+from .metadata_parser import parse_front_matter, local_metadata, overall_confidence, metadata_escalations
 
 # 設置日誌
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 下載必要的 NLTK 數據
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    logger.info("NLTK 數據下載完成")
-except Exception as e:
-    logger.error(f"下載 NLTK 數據時發生錯誤: {str(e)}")
+# 摘要模型與句子模型皆由 model_registry 在第一次使用時載入
+
+COMBINED_SYSTEM_PROMPT = (
+    "You are an academic paper analyst. Read the paper and reply with one JSON object with keys: "
+    "\"abstract\" (a concise and accurate abstract in English), "
+    "\"summary\" (一段以繁體中文撰寫的精煉摘要，突出論文的主要貢獻和發現)"
+)
+COMBINED_METADATA_PROMPT = (
+    ", and \"metadata\" (an object with keys: title(string), authors(list), journal(string), "
+    "year(string), keywords(list), topic(string))"
+)
+
+
+class LLMMetadata(BaseModel):
+    """LLM 回傳的論文元數據"""
+    title: str = ""
+    authors: List[str] = []
+    journal: str = ""
+    year: str = ""
+    keywords: List[str] = []
+    topic: str = ""
+
+    @field_validator("authors", "keywords", mode="before")
+    @classmethod
+    def _split_string(cls, value: Any) -> Any:
+        # 模型偶爾以逗號分隔的字串回傳列表欄位
+        if isinstance(value, str):
+            return [part.strip() for part in value.replace(";", ",").split(",") if part.strip()]
+        return value or []
 
-# 全局變量用於緩存模型
-_summarizer = None
-_sentence_model = None
+    @field_validator("title", "journal", "year", "topic", mode="before")
+    @classmethod
+    def _to_string(cls, value: Any) -> Any:
+        return "" if value is None else str(value)
+
+
+class CombinedPaperOutput(BaseModel):
+    """單次 LLM 呼叫回傳的元數據、英文摘要與中文摘要"""
+    abstract: str = Field(min_length=1)
+    summary: str = Field(min_length=1)
+    metadata: Optional[LLMMetadata] = None
 
 class PaperProcessor:
     def __init__(self):
-        global _summarizer, _sentence_model
-        
         # 初始化 OpenAI 客戶端
         try:
             self.openai_client = AsyncOpenAI(
@@ -57,51 +75,10 @@ class PaperProcessor:
             logger.error(f"初始化 OpenAI 客戶端時發生錯誤: {str(e)}")
             self.openai_client = None
 
-        # 使用緩存的模型或創建新模型
-        if _summarizer is None:
-            try:
-                logger.info("正在加載摘要模型...")
-                # 使用更小的模型
-                model_name = "facebook/bart-base"  # 改用更小的模型
-                tokenizer = AutoTokenizer.from_pretrained(model_name)
-                model = AutoModelForSeq2SeqLM.from_pretrained(
-                    model_name,
-                    low_cpu_mem_usage=True,
-                    torch_dtype=torch.float32
-                )
-                _summarizer = pipeline(
-                    "summarization",
-                    model=model,
-                    tokenizer=tokenizer,
-                    device=-1,  # 使用 CPU
-                    model_kwargs={
-                        "low_cpu_mem_usage": True,
-                        "torch_dtype": torch.float32
-                    }
-                )
-                logger.info("摘要模型加載完成")
-            except Exception as e:
-                logger.error(f"加載摘要模型時發生錯誤: {str(e)}", exc_info=True)
-                _summarizer = None
-                
-        if _sentence_model is None:
-            if SentenceTransformer:
-                try:
-                    logger.info("正在加載句子模型...")
-                    _sentence_model = SentenceTransformer(
-                        'all-MiniLM-L6-v2',
-                        device='cpu',
-                        cache_folder=os.path.join(os.path.expanduser("~"), ".cache", "sentence_transformers")
-                    )
-                    logger.info("句子模型加載完成")
-                except Exception as e:
-                    logger.error(f"加載句子模型時發生錯誤: {str(e)}", exc_info=True)
-                    _sentence_model = None
-            else:
-                _sentence_model = None
-            
-        self.summarizer = _summarizer
-        self.sentence_model = _sentence_model
+        # 所有 LLM 呼叫經由持久化快取
+        self.llm = CachedLLMClient(self.openai_client) if self.openai_client else None
+        self.map_reduce = MapReduceSummarizer(self.llm) if self.llm else None
+
         self.upload_folder = settings.UPLOAD_FOLDER
         
         # 確保上傳目錄存在
@@ -112,6 +89,16 @@ class PaperProcessor:
             logger.error(f"創建上傳目錄時發生錯誤: {str(e)}", exc_info=True)
             raise
 
+    @property
+    def summarizer(self):
+        """本地摘要模型（延遲載入）"""
+        return model_registry.get("summarizer")
+
+    @property
+    def sentence_model(self):
+        """句子嵌入模型（延遲載入）"""
+        return model_registry.get("sentence")
+
     def translate_to_chinese(self, text: str) -> str:
         """將文本翻譯成繁體中文"""
         try:
@@ -180,144 +167,39 @@ class PaperProcessor:
             logger.error(f"轉換繁體中文時發生錯誤: {str(e)}")
             return text
 
-    def extract_text_from_pdf(self, file_path: str) -> str:
-        """從 PDF 文件中提取文本"""
-        try:
-            logger.info(f"正在從 PDF 提取文本: {file_path}")
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            logger.info("PDF 文本提取完成")
-            return text
-        except Exception as e:
-            logger.error(f"從 PDF 提取文本時發生錯誤: {str(e)}", exc_info=True)
-            raise
+    def extract_metadata(self, text: str, title_hint: Optional[str] = None) -> Dict[str, Any]:
+        """從論文開頭提取基本元數據，title_hint 為版面分析得到的標題"""
+        return parse_front_matter(text, title_hint)
 
-    def extract_text_from_docx(self, file_path: str) -> str:
-        """從 DOCX 文件中提取文本"""
+    @staticmethod
+    def pdf_info(file_path: str) -> Dict[str, Optional[str]]:
+        """PDF 第一頁的版面標題與內嵌 title / author，非 PDF 或讀取失敗時回傳空字典"""
+        if os.path.splitext(file_path)[1].lower() != '.pdf':
+            return {}
         try:
-            logger.info(f"正在從 DOCX 提取文本: {file_path}")
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            logger.info("DOCX 文本提取完成")
-            return text
+            return text_extraction.pdf_front_matter(file_path)
         except Exception as e:
-            logger.error(f"從 DOCX 提取文本時發生錯誤: {str(e)}", exc_info=True)
-            raise
+            logger.warning(f"讀取 PDF 版面與內嵌資訊時發生錯誤: {str(e)}")
+            return {}
 
-    def extract_text(self, file_path: str) -> str:
-        """根據文件類型提取文本"""
-        try:
-            file_ext = os.path.splitext(file_path)[1].lower()
-            if file_ext == '.pdf':
-                return self.extract_text_from_pdf(file_path)
-            elif file_ext == '.docx':
-                return self.extract_text_from_docx(file_path)
-            else:
-                raise ValueError(f"不支援的文件類型: {file_ext}")
-        except Exception as e:
-            logger.error(f"提取文本時發生錯誤: {str(e)}", exc_info=True)
-            raise
+    async def digest_text(self, text: str) -> Optional[List[str]]:
+        """長文件先以 map-reduce 產生分塊筆記，供摘要階段共用；短文件回傳 None"""
+        if not self.map_reduce or not text or not text.strip():
+            return None
+        return await self.map_reduce.digest(text)
 
-    def extract_metadata(self, text: str) -> Dict[str, str]:
-        """提取論文的基本元數據"""
-        lines = text.split('\n')
-        metadata = {
-            'title': '',
-            'authors': [],
-            'journal': '',
-            'year': '',
-            'keywords': [],
-        }
-        
-        # 標題通常跨多行，收集首段連續非空行直到空行或作者標記，合併為完整標題
-        title_lines: List[str] = []
-        author_markers = ['Authors:', 'Author:', 'By:', 'Written by:', 'Contributors:']
-        for l in lines:
-            clean = l.strip()
-            if not clean or any(marker.lower() in clean.lower() for marker in author_markers):
-                break
-            title_lines.append(clean)
-        metadata['title'] = ' '.join(title_lines)
-        
-        # 作者提取邏輯
-        author_patterns = [
-            r'^[A-Z][a-z]+ [A-Z][a-z]+(?:, [A-Z][a-z]+ [A-Z][a-z]+)*$',  # 標準格式：John Smith, Jane Doe
-            r'^[A-Z][a-z]+ [A-Z][a-z]+ et al\.$',  # 帶 et al. 的格式
-            r'^[A-Z][a-z]+ [A-Z][a-z]+ and [A-Z][a-z]+ [A-Z][a-z]+$',  # 使用 and 連接的格式
-            r'^[A-Z][a-z]+ [A-Z][a-z]+; [A-Z][a-z]+ [A-Z][a-z]+$',  # 使用分號分隔的格式
-            r'^[A-Z][a-z]+ [A-Z][a-z]+ & [A-Z][a-z]+ [A-Z][a-z]+$',  # 使用 & 連接的格式
-        ]
-        
-        import re
-        author_lines = []
-        
-        # 檢查前 20 行尋找作者信息
-        for line in lines[1:20]:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # 檢查是否匹配任何作者模式
-            for pattern in author_patterns:
-                if re.match(pattern, line):
-                    author_lines.append(line)
-                    break
-            
-            # 檢查是否包含常見的作者標記
-            author_markers = ['Authors:', 'Author:', 'By:', 'Written by:', 'Contributors:']
-            for marker in author_markers:
-                if marker in line:
-                    author_lines.append(line.replace(marker, '').strip())
-                    break
-        
-        # 處理找到的作者行
-        for author_line in author_lines:
-            # 移除 et al.
-            author_line = author_line.replace('et al.', '').strip()
-            
-            # 根據不同的分隔符分割作者
-            if ' and ' in author_line:
-                authors = author_line.split(' and ')
-            elif ';' in author_line:
-                authors = author_line.split(';')
-            elif ' & ' in author_line:
-                authors = author_line.split(' & ')
-            elif ',' in author_line:
-                authors = author_line.split(',')
-            else:
-                authors = [author_line]
-            
-            # 清理並添加作者
-            for author in authors:
-                author = author.strip()
-                if author and author not in metadata['authors']:
-                    metadata['authors'].append(author)
-        
-        # 尋找期刊和年份
-        for line in lines:
-            line = line.lower()
-            # 期刊識別
-            if any(journal in line for journal in ['journal', 'conference', 'proceedings', 'transactions']):
-                metadata['journal'] = line.strip()
-            # 年份識別（4位數字）
-            if re.search(r'\b(19|20)\d{2}\b', line):
-                year_match = re.search(r'\b(19|20)\d{2}\b', line)
-                if year_match:
-                    metadata['year'] = year_match.group()
-        
-        return metadata
-
-    async def generate_summary(self, text: str) -> Dict[str, str]:
-        """使用 GPT-4 直接對全文進行摘要"""
+    async def generate_summary(self, text: str, notes: Optional[List[str]] = None) -> Dict[str, str]:
+        """使用 GPT 對全文進行摘要，長文件以分塊筆記作為輸入（reduce）"""
         try:
             if not text or not text.strip():
                 return {"content": "摘要內容不可用", "language": "zh-TW"}
 
-            response = await self.openai_client.chat.completions.create(
+            if notes:
+                content = "以下是一篇論文各部分的重點筆記：\n\n" + MapReduceSummarizer.format_notes(notes)
+            else:
+                content = text if self.map_reduce and self.map_reduce.fits(text) else text[:10000]
+
+            summary = await self.llm.complete(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -326,44 +208,22 @@ class PaperProcessor:
                     },
                     {
                         "role": "user",
-                        "content": text[:10000]
+                        "content": content
                     }
                 ],
                 temperature=0.3,
                 max_tokens=1000
             )
 
-            summary = response.choices[0].message.content.strip()
             return {"content": summary, "language": "zh-TW"}
         except Exception as e:
             logger.error(f"生成摘要時發生錯誤: {str(e)}")
             return {"content": "生成摘要時發生錯誤", "language": "zh-TW"}
 
     def extract_keywords(self, text: str) -> List[str]:
-        """提取關鍵詞"""
+        """以 TF-IDF（語料文件頻率）提取關鍵詞與片語"""
         try:
-            # 使用 NLTK 進行分詞和詞性標註
-            tokens = nltk.word_tokenize(text.lower())
-            tagged = nltk.pos_tag(tokens)
-            
-            # 只保留名詞、動詞和形容詞
-            filtered_words = [word for word, tag in tagged if tag.startswith(('NN', 'VB', 'JJ'))]
-            
-            # 移除停用詞
-            stop_words = set(nltk.corpus.stopwords.words('english'))
-            filtered_words = [word for word in filtered_words if word not in stop_words and len(word) > 3]
-            
-            # 計算詞頻
-            word_freq = {}
-            for word in filtered_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-            
-            # 按頻率排序並返回前 10 個關鍵詞
-            keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-            
-            # 返回關鍵詞列表
-            return [word for word, _ in keywords]
-            
+            return keyword_extractor.extract(text)
         except Exception as e:
             logger.error(f"提取關鍵詞時發生錯誤: {str(e)}", exc_info=True)
             return []  # 如果出錯，返回空列表
@@ -385,80 +245,209 @@ class PaperProcessor:
             print(f"Error calculating similarity: {e}")
             return 0.0
 
-    async def process_paper(self, file_path: str) -> Dict[str, Any]:
-        """處理論文文件"""
+    async def _llm_metadata(self, text: str) -> Dict[str, Any]:
+        """使用 GPT 解析論文元數據，解析失敗時回傳空字典"""
+        if not self.openai_client:
+            return {}
+        content = await self.llm.complete(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are an academic paper parser. Extract paper metadata as JSON with keys: title(string), authors(list), journal(string), year(string), keywords(list), topic(string)."},
+                {"role": "user", "content": f"Parse metadata from the following academic paper text (first 10000 characters):\n\n{text[:10000]}"}
+            ],
+            temperature=0
+        )
+        try:
+            meta_json = json.loads(content)
+            if not isinstance(meta_json, dict):
+                raise ValueError("metadata is not a JSON object")
+            return meta_json
+        except Exception:
+            logger.warning("GPT metadata parsing failed, fallback to local extraction.")
+            return {}
+
+    def _extract_local_abstract(self, text: str) -> str:
+        """本地摘要提取"""
+        abstract = ""
+        lines = text.split('\n')
+        for i, line in enumerate(lines):
+            if "abstract" in line.lower():
+                abstract_lines = []
+                for next_line in lines[i+1:]:
+                    if next_line.strip() and not any(marker in next_line.lower() for marker in ["introduction", "keywords", "1."]):
+                        abstract_lines.append(next_line.strip())
+                    else:
+                        break
+                abstract = " ".join(abstract_lines)
+                break
+
+        if not abstract:
+            abstract = text[:500]
+        return abstract
+
+    async def _llm_abstract(self, text: str, notes: Optional[List[str]] = None) -> str:
+        """使用 GPT 生成英文摘要，長文件以分塊筆記作為輸入；無客戶端時使用本地提取結果"""
+        if not self.openai_client:
+            return self._extract_local_abstract(text)
+        if notes:
+            content = "Notes taken from each part of the paper:\n\n" + MapReduceSummarizer.format_notes(notes)
+        else:
+            content = text[:5000]
+        return await self.llm.complete(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are an academic paper abstract extractor. Provide a concise and accurate abstract in English."},
+                {"role": "user", "content": content}
+            ],
+            temperature=0
+        )
+
+    async def _llm_separate(self, text: str, notes: Optional[List[str]], with_metadata: bool) -> Dict[str, Any]:
+        """以個別的 LLM 呼叫取得元數據（需要時）、英文摘要與中文摘要"""
+        metadata, abstract, summary = await asyncio.gather(
+            self._llm_metadata(text) if with_metadata else asyncio.sleep(0, result={}),
+            self._llm_abstract(text, notes),
+            self.generate_summary(text, notes),
+        )
+        return {"metadata": metadata, "abstract": abstract, "summary": summary}
+
+    async def _llm_combined(self, text: str, notes: Optional[List[str]], with_metadata: bool) -> Dict[str, Any]:
+        """以單次 JSON 回應取得元數據（需要時）、英文摘要與中文摘要，全文只送出一次
+
+        回應需符合 CombinedPaperOutput；呼叫、解析或驗證失敗時改用個別呼叫。
+        """
+        if notes:
+            content = "Notes taken from each part of the paper:\n\n" + MapReduceSummarizer.format_notes(notes)
+            if with_metadata:
+                # 筆記不含作者等資訊，另外附上論文開頭
+                content = f"First page of the paper:\n\n{text[:3000]}\n\n{content}"
+        else:
+            content = text if self.map_reduce and self.map_reduce.fits(text) else text[:10000]
+        system = COMBINED_SYSTEM_PROMPT + (COMBINED_METADATA_PROMPT if with_metadata else "") + "."
         try:
-            text = self.extract_text(file_path)
+            response = await self.llm.complete(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": content}
+                ],
+                temperature=0,
+                max_tokens=2000,
+                response_format={"type": "json_object"}
+            )
+            output = CombinedPaperOutput.model_validate_json(response)
+        except Exception as e:
+            logger.warning(f"合併的 LLM 呼叫失敗或回應格式不符，改用個別呼叫: {str(e)}")
+            return await self._llm_separate(text, notes, with_metadata)
+
+        metadata = output.metadata.model_dump() if output.metadata else {}
+        if with_metadata and not output.metadata:
+            metadata = await self._llm_metadata(text)
+        return {
+            "metadata": metadata,
+            "abstract": output.abstract,
+            "summary": {"content": output.summary, "language": "zh-TW"},
+        }
+
+    async def process_paper(
+        self,
+        file_path: str,
+        on_stage: Optional[Callable[[str, int], Awaitable[None]]] = None,
+        content_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """處理論文文件，on_stage(stage, progress) 用於回報處理進度
+
+        提供 content_hash 時，全文會壓縮保存於 document_texts，重新處理同一文件
+        時直接讀取，不再解析原始檔案。
+
+        元數據先由本地來源（論文開頭、PDF 版面與內嵌資訊、DOI / arXiv 編號）取得，
+        信心低於 METADATA_CONFIDENCE_THRESHOLD 時才呼叫 LLM，且只以 LLM 結果取代
+        信心不足的欄位。
+        LLM_COMBINED_CALL 開啟時，元數據、英文摘要與中文摘要以單次結構化（JSON）
+        呼叫取得，回應不符格式時改用個別呼叫；關閉時三者以個別呼叫並行執行。
+        元數據、英文摘要與中文摘要三個 LLM 呼叫互不依賴，以階段依賴圖並行執行；
+        關鍵詞階段依賴元數據結果（GPT 未提供時才做本地提取）。長文件的兩個摘要
+        階段依賴 digest 階段產生的分塊筆記（map-reduce），不再只看前幾頁。
+        """
+        async def report(stage: str, progress: int):
+            if on_stage:
+                await on_stage(stage, progress)
+
+        try:
+            await report("extracting", 10)
+            # 優先使用已保存的全文；否則在進程池中解析，長 PDF 依頁碼區間並行處理
+            text = (await get_or_extract(file_path, content_hash)).text
             if not text:
                 raise ValueError("無法從文件中提取文本")
 
-            metadata = self.extract_metadata(text)
+            pdf_info = await asyncio.to_thread(self.pdf_info, file_path)
+            metadata, confidence = local_metadata(text, pdf_info)
+            threshold = settings.METADATA_CONFIDENCE_THRESHOLD
+            escalate = self.llm is not None and overall_confidence(confidence) < threshold
+            metadata_escalations.record(escalate)
+            logger.info(
+                f"本地元數據信心 {confidence}，{'呼叫 LLM 補足' if escalate else '略過 LLM 元數據呼叫'}；"
+                f"統計: {metadata_escalations.stats()}"
+            )
 
-            topic = None
-            keywords = []
+            async def resolve_metadata(deps: Dict[str, Any]) -> Dict[str, Any]:
+                return await self._llm_metadata(text) if escalate else {}
 
-            if self.openai_client:
-                title_resp = await self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are an academic paper parser. Extract paper metadata as JSON with keys: title(string), authors(list), journal(string), year(string), keywords(list), topic(string)."},
-                        {"role": "user", "content": f"Parse metadata from the following academic paper text (first 10000 characters):\n\n{text[:10000]}"}
-                    ],
-                    temperature=0
-                )
-                try:
-                    meta_json = json.loads(title_resp.choices[0].message.content.strip())
-                    metadata['title'] = meta_json.get('title', metadata['title'])
-                    metadata['authors'] = meta_json.get('authors', metadata['authors'])
-                    metadata['year'] = meta_json.get('year', metadata['year'])
-                    metadata['journal'] = meta_json.get('journal', metadata['journal'])
-                    keywords = meta_json.get('keywords', [])
-                    topic = meta_json.get('topic', None)
-                except Exception:
-                    logger.warning("GPT metadata parsing failed, fallback to local extraction.")
-
-            # 本地摘要提取
-            abstract = ""
-            lines = text.split('\n')
-            for i, line in enumerate(lines):
-                if "abstract" in line.lower():
-                    abstract_lines = []
-                    for next_line in lines[i+1:]:
-                        if next_line.strip() and not any(marker in next_line.lower() for marker in ["introduction", "keywords", "1."]):
-                            abstract_lines.append(next_line.strip())
-                        else:
-                            break
-                    abstract = " ".join(abstract_lines)
-                    break
-
-            if not abstract:
-                abstract = text[:500]
-
-            if self.openai_client:
-                abstract_resp = await self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are an academic paper abstract extractor. Provide a concise and accurate abstract in English."},
-                        {"role": "user", "content": text[:5000]}
-                    ],
-                    temperature=0
+            combined = settings.LLM_COMBINED_CALL and self.llm is not None
+            metadata_stage = "document" if combined else "metadata"
+
+            async def resolve_keywords(deps: Dict[str, Any]) -> List[str]:
+                # GPT 未提供時依序使用論文標示的關鍵詞與本地提取結果
+                llm_metadata = deps["document"]["metadata"] if combined else deps["metadata"]
+                keywords = llm_metadata.get('keywords', []) or metadata['keywords']
+                if not keywords:
+                    keywords = await asyncio.to_thread(self.extract_keywords, text)
+                return keywords
+
+            stages = {
+                # 長文件的分塊筆記由英文摘要與中文摘要共用
+                "digest": Stage(lambda deps: self.digest_text(text)),
+                "keywords": Stage(resolve_keywords, deps=(metadata_stage,)),
+            }
+            if combined:
+                stages["document"] = Stage(
+                    lambda deps: self._llm_combined(text, deps["digest"], escalate), deps=("digest",)
                 )
-                abstract = abstract_resp.choices[0].message.content.strip()
+            else:
+                stages.update({
+                    "metadata": Stage(resolve_metadata),
+                    "abstract": Stage(lambda deps: self._llm_abstract(text, deps["digest"]), deps=("digest",)),
+                    "summary": Stage(lambda deps: self.generate_summary(text, deps["digest"]), deps=("digest",)),
+                })
+
+            async def on_complete(name: str, completed: int, total: int):
+                await report(name, 10 + 80 * completed // total)
+
+            results = await run_stage_graph(
+                stages,
+                max_concurrency=settings.PAPER_STAGE_CONCURRENCY,
+                on_complete=on_complete
+            )
 
-            summary = await self.generate_summary(text)
+            if self.llm:
+                logger.info(f"LLM 快取統計: {self.llm.stats()}")
 
-            if not keywords:
-                keywords = self.extract_keywords(text)
+            # 合併呼叫的結果與個別呼叫的結果有相同的 metadata / abstract / summary 欄位
+            document = results["document"] if combined else results
+            meta_json = document["metadata"]
+            for field in ('title', 'authors', 'year', 'journal'):
+                if confidence[field] < threshold and meta_json.get(field):
+                    metadata[field] = meta_json[field]
 
             return {
                 "title": metadata.get('title', ''),
                 "authors": metadata.get('authors', []),
                 "journal": metadata.get('journal', ''),
                 "year": metadata.get('year', ''),
-                "abstract": abstract,
-                "summary": summary,
-                "keywords": keywords,
-                "topic": topic or ''
+                "abstract": document["abstract"],
+                "summary": document["summary"],
+                "keywords": results["keywords"],
+                "topic": meta_json.get('topic') or ''
             }
         except Exception as e:
             logger.error(f"處理論文時發生錯誤: {str(e)}", exc_info=True)
@@ -0,0 +1,223 @@
+from sqlalchemy import Column, event, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import datetime
+import logging
+import re
+import threading
+
+from ..models.paper import Paper, Keyword, Summary, Topic, Author, paper_author, paper_keyword
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+def normalize_authors(authors: Any) -> List[str]:
+    """整理 LLM / 解析器回傳的作者：去除空白與重複，單一字串視為一位作者"""
+    if not authors:
+        return []
+    if isinstance(authors, str):
+        authors = [authors]
+    names = (str(author).strip()[:200] for author in authors if author is not None)
+    return list(dict.fromkeys(name for name in names if name))
+
+_YEAR_RE = re.compile(r"(?<!\d)(?:1[89]|20)\d{2}(?!\d)")
+
+def normalize_year(year: Any) -> Optional[int]:
+    """將 LLM / 解析器回傳的年份（例如 "2017"、"2017a"、"May 2017"）轉為整數，缺少或無法辨識時為 None"""
+    if isinstance(year, int) and not isinstance(year, bool):
+        return year
+    match = _YEAR_RE.search(str(year)) if year else None
+    return int(match.group()) if match else None
+
+# 關鍵字與作者名稱 -> id 的行程內快取（這兩個表只會新增）。
+# 交易中取得的 id 先記在 session.info，提交後才放入快取，避免回滾後留下無效的 id
+_name_ids: Dict[str, Dict[str, int]] = {"keywords": {}, "authors": {}}
+_name_ids_lock = threading.Lock()
+
+@event.listens_for(Session, "after_commit")
+def _publish_name_ids(session: Session):
+    pending = session.info.pop("pending_name_ids", None)
+    if pending:
+        with _name_ids_lock:
+            for table, ids in pending.items():
+                _name_ids[table].update(ids)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_name_ids(session: Session, previous_transaction):
+    session.info.pop("pending_name_ids", None)
+
+def resolve_name_ids(db: Session, column: Column, names: List[str]) -> Dict[str, int]:
+    """取得唯一欄位（Keyword.word / Author.name）中各名稱所在列的 id，不存在時新增
+
+    快取未命中的名稱以一次 INSERT ... ON CONFLICT DO NOTHING RETURNING 新增，
+    已存在（或由其他交易同時新增）的再以一次 SELECT 取得，往返次數與名稱數量無關，
+    並行上傳相同的新名稱也不會違反唯一限制。
+    """
+    table = column.table
+    with _name_ids_lock:
+        cached = _name_ids[table.name]
+        ids = {name: cached[name] for name in names if name in cached}
+    missing = [name for name in names if name not in ids]
+    if not missing:
+        return ids
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = (
+            dialect_insert(table)
+            .values([{column.name: name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[column.name])
+            .returning(column, table.c.id)
+        )
+        found = dict(db.execute(statement).all())
+    else:
+        found = {}
+    remaining = [name for name in missing if name not in found]
+    if remaining:
+        found.update(db.execute(select(column, table.c.id).where(column.in_(remaining))).all())
+        absent = [name for name in remaining if name not in found]
+        if absent:
+            # 不支援 ON CONFLICT 的資料庫：逐筆新增
+            for name in absent:
+                found[name] = db.execute(insert(table).values({column.name: name})).inserted_primary_key[0]
+
+    db.info.setdefault("pending_name_ids", {}).setdefault(table.name, {}).update(found)
+    ids.update(found)
+    return ids
+
+def normalize_keywords(keywords: Any) -> List[str]:
+    """整理關鍵字：去除空白與重複，長度限制與 keywords.word 相同"""
+    if not keywords:
+        return []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    words = (str(keyword).strip()[:100] for keyword in keywords if keyword is not None)
+    return list(dict.fromkeys(word for word in words if word))
+
+def link_keywords(db: Session, paper: Paper, words: List[str]):
+    """建立論文-關鍵字關聯（論文須已 flush）"""
+    if not words:
+        return
+    ids = resolve_name_ids(db, Keyword.word, words)
+    db.execute(insert(paper_keyword), [{"paper_id": paper.id, "keyword_id": ids[word]} for word in words])
+    db.expire(paper, ["keywords"])
+
+def link_authors(db: Session, paper: Paper):
+    """依 paper.authors 建立正規化的作者記錄與論文-作者關聯（論文須已 flush）"""
+    if not paper.authors:
+        return
+    ids = resolve_name_ids(db, Author.name, paper.authors)
+    db.execute(insert(paper_author), [
+        {"paper_id": paper.id, "author_id": ids[name], "position": position}
+        for position, name in enumerate(paper.authors)
+    ])
+
+def create_paper(
+    db: Session,
+    paper_data: Dict[str, Any],
+    file_path: str,
+    uploader_id: Optional[int] = None,
+    content_hash: Optional[str] = None
+) -> Paper:
+    """依 PaperProcessor.process_paper 的結果建立論文記錄（不提交交易）"""
+    # 創建摘要對象
+    summary = Summary(
+        content=paper_data["summary"]["content"],
+        created_at=datetime.utcnow()
+    )
+
+    # 創建論文記錄，記錄上傳者
+    paper = Paper(
+        title=paper_data["title"][:500],
+        authors=normalize_authors(paper_data["authors"]),
+        journal=paper_data["journal"],
+        year=normalize_year(paper_data["year"]),
+        abstract=paper_data["abstract"],
+        file_path=file_path,
+        content_hash=content_hash,
+        summary=summary,  # 直接設置 summary 關係
+        uploader_id=uploader_id
+    )
+
+    db.add(paper)
+    db.flush()
+    # 關鍵字與作者以批次 upsert 解析 id 後直接寫入關聯表
+    link_keywords(db, paper, normalize_keywords(paper_data["keywords"]))
+    link_authors(db, paper)
+    return paper
+
+def find_paper_by_hash(db: Session, content_hash: str) -> Optional[int]:
+    """依內容雜湊查詢已存在的論文 id"""
+    return db.query(Paper.id).filter(Paper.content_hash == content_hash).scalar()
+
+def find_papers_by_hashes(db: Session, content_hashes: Iterable[str]) -> Dict[str, int]:
+    """批次查詢內容雜湊對應的論文 id"""
+    content_hashes = set(content_hashes)
+    if not content_hashes:
+        return {}
+    rows = db.query(Paper.content_hash, Paper.id).filter(Paper.content_hash.in_(content_hashes)).all()
+    return {content_hash: paper_id for content_hash, paper_id in rows}
+
+# 論文列表可選的欄位：欄位名稱 -> 需要載入的資料行（None 表示由關聯載入）
+LIST_COLUMNS = {
+    "id": Paper.id,
+    "title": Paper.title,
+    "authors": Paper.authors,
+    "journal": Paper.journal,
+    "year": Paper.year,
+    "abstract": Paper.abstract,
+    "file_path": Paper.file_path,
+    "created_at": Paper.created_at,
+    "uploader_id": Paper.uploader_id,
+    "summary": None,
+    "keywords": None,
+    "topic": None,
+    "uploader_name": None,
+}
+# 未指定 fields 時回傳的欄位（首頁卡片所需），不含摘要等長文本
+DEFAULT_LIST_FIELDS = ("id", "title", "authors", "journal", "year", "created_at", "keywords", "uploader_id", "uploader_name")
+
+def parse_list_fields(fields: Optional[str]) -> List[str]:
+    """解析逗號分隔的欄位列表，未知欄位拋出 ValueError；id 一律包含"""
+    if not fields:
+        return list(DEFAULT_LIST_FIELDS)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in LIST_COLUMNS]
+    if unknown:
+        raise ValueError(f"未知的欄位: {', '.join(unknown)}，可用欄位: {', '.join(LIST_COLUMNS)}")
+    return list(dict.fromkeys(["id"] + selected))
+
+def list_load_options(fields: List[str]) -> list:
+    """只載入指定欄位所需的資料行與關聯（SQL 層級的投影）"""
+    columns = [LIST_COLUMNS[field] for field in fields if LIST_COLUMNS[field] is not None]
+    options = [load_only(*columns)]
+    if "summary" in fields:
+        options.append(joinedload(Paper.summary).load_only(Summary.content))
+    if "keywords" in fields:
+        options.append(selectinload(Paper.keywords).load_only(Keyword.word))
+    if "topic" in fields:
+        options.append(joinedload(Paper.topic).load_only(Topic.name))
+    if "uploader_name" in fields:
+        options.append(joinedload(Paper.uploader).load_only(User.name, User.username))
+    return options
+
+def to_list_item(paper: Paper, fields: List[str]) -> Dict[str, Any]:
+    """依指定欄位組成論文列表項目，未要求的欄位不會被存取（不觸發延遲載入）"""
+    item = {}
+    for field in fields:
+        if field == "authors":
+            item[field] = paper.authors or []
+        elif field == "summary":
+            item[field] = paper.summary.content if paper.summary else None
+        elif field == "keywords":
+            item[field] = [keyword.word for keyword in paper.keywords]
+        elif field == "topic":
+            item[field] = paper.topic.name if paper.topic else None
+        elif field == "uploader_name":
+            uploader = paper.uploader
+            item[field] = (uploader.name or uploader.username) if uploader else None
+        else:
+            item[field] = getattr(paper, field)
+    return item
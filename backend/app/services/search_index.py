@@ -0,0 +1,335 @@
+import heapq
+import html
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session, selectinload
+
+from ..core.config import settings
+from ..db.session import SessionLocal, engine
+from ..models.paper import Paper
+from .pagination import decode_score_cursor, encode_score_cursor
+from .text_analysis import analyze, iter_tokens
+from .text_store import load_text
+
+logger = logging.getLogger(__name__)
+
+# 各欄位的權重等級（對應 PostgreSQL setweight 的 A-D）
+FIELD_WEIGHTS = {"title": "A", "abstract": "B", "summary": "B", "content": "D"}
+
+Hit = Tuple[int, float]
+
+
+def load_documents(db: Session, paper_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, str]]:
+    """讀取論文要建立索引的欄位：標題、摘要、中文摘要與提取的全文"""
+    query = db.query(Paper).options(selectinload(Paper.summary))
+    if paper_ids is not None:
+        query = query.filter(Paper.id.in_(list(paper_ids)))
+    documents = {}
+    for paper in query:
+        stored = load_text(paper.content_hash) if paper.content_hash else None
+        documents[paper.id] = {
+            "title": paper.title or "",
+            "abstract": paper.abstract or "",
+            "summary": paper.summary.content if paper.summary else "",
+            "content": stored.text[:settings.SEARCH_CONTENT_CHARS] if stored else "",
+        }
+    return documents
+
+
+class PostgresSearchBackend:
+    """papers.search_vector（tsvector + GIN 索引）
+
+    tsvector 由 text_analysis 分析後的詞彙以 'simple' 設定建立，排序使用
+    ts_rank_cd 並開啟文件長度正規化（1）與 rank/(rank+1) 飽和（32），
+    行為接近 BM25 的詞頻飽和與長度正規化。
+    """
+
+    # D, C, B, A 的權重
+    WEIGHTS = "{0.1, 0.2, 0.4, 1.0}"
+
+    def index(self, db: Session, documents: Dict[int, Dict[str, str]]):
+        statement = text(
+            "UPDATE papers SET search_vector = "
+            + " || ".join(
+                f"setweight(to_tsvector('simple', :{field}), '{weight}')"
+                for field, weight in FIELD_WEIGHTS.items()
+            )
+            + " WHERE id = :id"
+        )
+        for paper_id, document in documents.items():
+            db.execute(statement, {
+                "id": paper_id,
+                **{field: " ".join(analyze(document[field])) for field in FIELD_WEIGHTS},
+            })
+
+    def remove(self, paper_id: int):
+        # tsvector 存放在 papers 表中，隨論文一併刪除
+        pass
+
+    def search(self, db: Session, terms: List[str], limit: int, after: Optional[Hit]) -> List[Hit]:
+        tsquery = " & ".join("'" + term.replace("'", "''") + "'" for term in terms)
+        keyset = "WHERE score < :after_score OR (score = :after_score AND id < :after_id)" if after else ""
+        rows = db.execute(text(f"""
+            SELECT id, score FROM (
+                SELECT p.id, ts_rank_cd('{self.WEIGHTS}', p.search_vector, query, 33)::float8 AS score
+                FROM papers p, to_tsquery('simple', :query) query
+                WHERE p.search_vector @@ query
+            ) ranked
+            {keyset}
+            ORDER BY score DESC, id DESC
+            LIMIT :limit
+        """), {
+            "query": tsquery,
+            "limit": limit,
+            "after_score": after[1] if after else None,
+            "after_id": after[0] if after else None,
+        })
+        return [(paper_id, score) for paper_id, score in rows]
+
+
+class MemorySearchBackend:
+    """行程內的倒排索引與 BM25 排序（SQLite 等沒有全文索引的資料庫使用）
+
+    各欄位的詞頻依權重加總後計算 BM25。第一次搜尋時從資料庫載入，之後隨
+    index / remove 增量更新；若偵測到其他進程寫入（論文數或最後更新時間
+    改變）則重新載入。
+    """
+
+    FIELD_BOOSTS = {"A": 3.0, "B": 1.5, "C": 1.2, "D": 1.0}
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._lengths: Dict[int, float] = {}
+        self._terms: Dict[int, List[str]] = {}
+        self._total_length = 0.0
+        self._generation = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _current_generation(db: Session):
+        return tuple(db.query(func.count(Paper.id), func.max(Paper.updated_at)).one())
+
+    def _add(self, paper_id: int, document: Dict[str, str]):
+        self._remove(paper_id)
+        frequencies: Counter = Counter()
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            boost = self.FIELD_BOOSTS[weight]
+            tokens = analyze(document[field])
+            length += boost * len(tokens)
+            for token, count in Counter(tokens).items():
+                frequencies[token] += boost * count
+        for token, frequency in frequencies.items():
+            self._postings[token][paper_id] = frequency
+        self._terms[paper_id] = list(frequencies)
+        self._lengths[paper_id] = length
+        self._total_length += length
+
+    def _remove(self, paper_id: int):
+        for token in self._terms.pop(paper_id, []):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(paper_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._lengths.pop(paper_id, 0.0)
+
+    def _ensure_loaded(self, db: Session):
+        generation = self._current_generation(db)
+        if generation == self._generation:
+            return
+        logger.info("正在載入全文搜尋索引")
+        self._postings.clear()
+        self._lengths.clear()
+        self._terms.clear()
+        self._total_length = 0.0
+        for paper_id, document in load_documents(db).items():
+            self._add(paper_id, document)
+        self._generation = generation
+
+    def index(self, db: Session, documents: Dict[int, Dict[str, str]]):
+        with self._lock:
+            loaded = self._generation is not None
+            for paper_id, document in documents.items():
+                self._add(paper_id, document)
+            if loaded:
+                self._generation = self._current_generation(db)
+
+    def remove(self, paper_id: int):
+        with self._lock:
+            self._remove(paper_id)
+            # 論文數已改變，下次搜尋時以資料庫狀態為準
+            if self._generation is not None:
+                count, updated_at = self._generation
+                self._generation = (count - 1, updated_at)
+
+    def search(self, db: Session, terms: List[str], limit: int, after: Optional[Hit]) -> List[Hit]:
+        with self._lock:
+            self._ensure_loaded(db)
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for other in postings[1:]:
+                candidates.intersection_update(other)
+            if not candidates:
+                return []
+
+            total = len(self._lengths)
+            average = self._total_length / total if total else 1.0
+            scores: Dict[int, float] = dict.fromkeys(candidates, 0.0)
+            for term_postings in postings:
+                idf = math.log(1 + (total - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                for paper_id in candidates:
+                    frequency = term_postings[paper_id]
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[paper_id] / average)
+                    scores[paper_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        hits = scores.items()
+        if after:
+            after_id, after_score = after
+            hits = [
+                (paper_id, score) for paper_id, score in hits
+                if score < after_score or (score == after_score and paper_id < after_id)
+            ]
+        return heapq.nsmallest(limit, hits, key=lambda hit: (-hit[1], -hit[0]))
+
+
+def highlight(source: str, terms: Iterable[str], width: int = 200) -> Optional[str]:
+    """擷取包含最多查詢詞的片段，並以 <mark> 標示符合的詞彙（其餘文字已跳脫）"""
+    terms = set(terms)
+    matches = [(start, end, token) for token, start, end in iter_tokens(source) if token in terms]
+    if not matches:
+        return None
+
+    # 選出寬度內涵蓋最多不同查詢詞的起點
+    best, best_count = 0, 0
+    window: Counter = Counter()
+    j = 0
+    for i, (start, _, _) in enumerate(matches):
+        while j < len(matches) and matches[j][0] - start <= width:
+            window[matches[j][2]] += 1
+            j += 1
+        if len(window) > best_count:
+            best, best_count = i, len(window)
+        window[matches[i][2]] -= 1
+        if not window[matches[i][2]]:
+            del window[matches[i][2]]
+    window_start = max(0, matches[best][0] - width // 4)
+    window_end = min(len(source), window_start + width)
+
+    # 中文 bigram 會互相重疊，先合併成連續區段再標示
+    spans: List[List[int]] = []
+    for start, end, _ in matches:
+        if start < window_start or end > window_end:
+            continue
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+
+    parts, position = [], window_start
+    for start, end in spans:
+        parts.append(html.escape(source[position:start]))
+        parts.append(f"<mark>{html.escape(source[start:end])}</mark>")
+        position = end
+    parts.append(html.escape(source[position:window_end]))
+    snippet = "".join(parts).strip()
+    return ("…" if window_start > 0 else "") + snippet + ("…" if window_end < len(source) else "")
+
+
+class SearchIndex:
+    """論文全文搜尋：PostgreSQL 使用 tsvector + GIN，其他資料庫使用行程內倒排索引"""
+
+    def __init__(self):
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if engine.dialect.name == "postgresql":
+                self._backend = PostgresSearchBackend()
+            else:
+                self._backend = MemorySearchBackend()
+        return self._backend
+
+    @staticmethod
+    def query_terms(query: str) -> List[str]:
+        return list(dict.fromkeys(analyze(query, query=True)))
+
+    def index_papers(self, paper_ids: Iterable[int]) -> int:
+        """建立或更新論文的全文索引，失敗時記錄錯誤並回傳 0"""
+        paper_ids = list(paper_ids)
+        db = SessionLocal()
+        try:
+            documents = load_documents(db, paper_ids)
+            self.backend.index(db, documents)
+            db.commit()
+            return len(documents)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"建立論文 {paper_ids} 全文索引時發生錯誤: {str(e)}", exc_info=True)
+            return 0
+        finally:
+            db.close()
+
+    def index_paper(self, paper_id: int) -> bool:
+        return self.index_papers([paper_id]) == 1
+
+    def remove_paper(self, paper_id: int):
+        self.backend.remove(paper_id)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Hit], Optional[str]]:
+        """依相關度排序搜尋論文，回傳 ([(paper_id, score)], 下一頁游標)
+
+        分頁以 (score, id) 為鍵（keyset），不使用 OFFSET。
+        """
+        terms = self.query_terms(query)
+        if not terms:
+            return [], None
+        after = decode_score_cursor(cursor) if cursor else None
+        hits = self.backend.search(db, terms, limit + 1, after)
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = encode_score_cursor(*hits[-1])
+        return hits, next_cursor
+
+    def snippet(self, paper: Paper, terms: List[str]) -> Optional[str]:
+        """依序從摘要、中文摘要與全文中擷取含查詢詞的片段"""
+        for source in (paper.abstract, paper.summary.content if paper.summary else None):
+            if source and (snippet := highlight(source, terms)):
+                return snippet
+        stored = load_text(paper.content_hash) if paper.content_hash else None
+        if stored is not None:
+            return highlight(stored.text[:settings.SEARCH_CONTENT_CHARS], terms)
+        return None
+
+    def rebuild(self, batch_size: int = 100) -> int:
+        """重新建立所有論文的全文索引"""
+        db = SessionLocal()
+        try:
+            paper_ids = [paper_id for paper_id, in db.query(Paper.id).order_by(Paper.id)]
+        finally:
+            db.close()
+        return sum(
+            self.index_papers(paper_ids[start:start + batch_size])
+            for start in range(0, len(paper_ids), batch_size)
+        )
+
+
+search_index = SearchIndex()
@@ -0,0 +1,128 @@
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.paper import Paper
+from .model_registry import model_registry
+from .summarizer import chunk_text
+from .text_store import load_text
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# all-MiniLM-L6-v2 的輸出維度
+EMBEDDING_DIM = 384
+
+
+class SemanticSearch:
+    """論文語意搜尋：以句向量模型嵌入標題摘要與全文分塊，保存在向量索引中
+
+    每篇論文寫入一列「標題 + 摘要」向量，以及最多 max_chunks 列全文分塊向量；
+    查詢時同一篇論文取最相似的一列作為分數。
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.VECTOR_INDEX_DIR,
+        chunk_tokens: int = settings.SEMANTIC_CHUNK_TOKENS,
+        max_chunks: int = settings.SEMANTIC_MAX_CHUNKS,
+        min_train: int = settings.ANN_MIN_TRAIN,
+        nprobe: int = settings.ANN_NPROBE,
+    ):
+        self.directory = directory
+        self.chunk_tokens = chunk_tokens
+        self.max_chunks = max_chunks
+        self.min_train = min_train
+        self.nprobe = nprobe
+        self._index: Optional[VectorIndex] = None
+
+    @property
+    def index(self) -> VectorIndex:
+        if self._index is None:
+            self._index = VectorIndex(
+                self.directory, EMBEDDING_DIM, min_train=self.min_train, nprobe=self.nprobe
+            )
+        return self._index
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        model = model_registry.get("sentence")
+        if model is None:
+            raise RuntimeError("句向量模型無法使用")
+        return np.asarray(
+            model.encode(texts, batch_size=32, normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32
+        )
+
+    def paper_texts(self, paper: Paper) -> List[str]:
+        """論文要嵌入的文本：標題與摘要為第一列，其後為全文分塊"""
+        head = "\n".join(part for part in (paper.title, paper.abstract) if part)
+        texts = [head] if head.strip() else []
+
+        stored = load_text(paper.content_hash) if paper.content_hash else None
+        if stored is not None and stored.text.strip():
+            chunks = [c for c in chunk_text(stored.text, self.chunk_tokens) if c.strip()]
+            if len(chunks) > self.max_chunks:
+                # 均勻取樣分塊，避免只涵蓋論文前段
+                picks = np.linspace(0, len(chunks) - 1, self.max_chunks).astype(int)
+                chunks = [chunks[i] for i in picks]
+            texts.extend(chunks)
+        return texts
+
+    def index_paper(self, paper_id: int, update_neighbors: bool = True) -> bool:
+        """計算並寫入論文向量（重新索引時先移除舊向量）並更新相似論文列表，失敗時記錄錯誤並回傳 False"""
+        db = SessionLocal()
+        try:
+            paper = db.query(Paper).filter(Paper.id == paper_id).first()
+            if paper is None:
+                return False
+            texts = self.paper_texts(paper)
+        finally:
+            db.close()
+
+        try:
+            if not texts:
+                return False
+            vectors = self.encode(texts)
+            self.index.remove(paper_id)
+            self.index.add(paper_id, vectors)
+            logger.info(f"論文 {paper_id} 已寫入向量索引（{len(texts)} 列）")
+            if update_neighbors:
+                from .similar_papers import similar_papers
+                similar_papers.update(paper_id)
+            return True
+        except Exception as e:
+            logger.error(f"寫入論文 {paper_id} 向量時發生錯誤: {str(e)}", exc_info=True)
+            return False
+
+    def index_papers(self, paper_ids: Iterable[int], update_neighbors: bool = True) -> int:
+        return sum(1 for paper_id in paper_ids if self.index_paper(paper_id, update_neighbors))
+
+    def remove_paper(self, paper_id: int):
+        try:
+            self.index.remove(paper_id)
+        except Exception as e:
+            logger.error(f"移除論文 {paper_id} 向量時發生錯誤: {str(e)}", exc_info=True)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """回傳與查詢最相似的 k 篇論文 (paper_id, score)"""
+        return self.index.search(self.encode([query])[0], k)
+
+    def rebuild(self) -> int:
+        """清空索引並重新嵌入所有論文，完成後重新計算所有相似論文列表"""
+        db = SessionLocal()
+        try:
+            paper_ids = [paper_id for paper_id, in db.query(Paper.id).order_by(Paper.id)]
+        finally:
+            db.close()
+        self.index.reset()
+        indexed = self.index_papers(paper_ids, update_neighbors=False)
+
+        from .similar_papers import similar_papers
+        similar_papers.recompute(paper_ids)
+        return indexed
+
+
+semantic_search = SemanticSearch()
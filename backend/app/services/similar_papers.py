@@ -0,0 +1,122 @@
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.paper_neighbor import PaperNeighbor
+from .semantic_search import SemanticSearch, semantic_search
+
+logger = logging.getLogger(__name__)
+
+
+class SimilarPapers:
+    """預先計算並保存每篇論文的前 k 篇相似論文
+
+    論文 A 對 B 的分數為 A 的「標題 + 摘要」向量與 B 所有向量的最高相似度，
+    與語意搜尋的計分方式相同。新增論文時寫入它自己的列表，並將它加入候選
+    論文的列表中（相似度近似對稱，只檢查新論文的前 2k 個候選）；刪除論文時
+    只重新計算原本列表中含有該論文的論文。
+    """
+
+    def __init__(self, search: SemanticSearch = semantic_search, k: int = settings.SIMILAR_PAPERS_K):
+        self.search = search
+        self.k = k
+
+    def compute(self, paper_id: int, k: int = None) -> List[Tuple[int, float]]:
+        """以向量索引計算論文的相似論文 (paper_id, score)"""
+        k = k or self.k
+        vectors = self.search.index.vectors_of(paper_id)
+        if len(vectors) == 0:
+            return []
+        hits = self.search.index.search(vectors[0], k + 1)
+        return [(other, score) for other, score in hits if other != paper_id][:k]
+
+    @staticmethod
+    def _replace(db, paper_id: int, neighbors: List[Tuple[int, float]]):
+        db.query(PaperNeighbor).filter(PaperNeighbor.paper_id == paper_id).delete(synchronize_session=False)
+        db.add_all(
+            PaperNeighbor(paper_id=paper_id, neighbor_id=neighbor_id, score=score)
+            for neighbor_id, score in neighbors
+        )
+
+    def update(self, paper_id: int):
+        """論文寫入向量索引後，更新它自己與候選論文的相似列表"""
+        candidates = self.compute(paper_id, 2 * self.k)
+        vectors = self.search.index.vectors_of(paper_id)
+        db = SessionLocal()
+        try:
+            self._replace(db, paper_id, candidates[:self.k])
+
+            candidate_ids = [other for other, _ in candidates]
+            lists: Dict[int, List[PaperNeighbor]] = {other: [] for other in candidate_ids}
+            for row in db.query(PaperNeighbor).filter(PaperNeighbor.paper_id.in_(candidate_ids)):
+                lists[row.paper_id].append(row)
+
+            for other in candidate_ids:
+                head = self.search.index.vectors_of(other)
+                if len(head) == 0:
+                    continue
+                score = float(np.max(vectors @ head[0]))
+                existing = next((row for row in lists[other] if row.neighbor_id == paper_id), None)
+                rows = [row for row in lists[other] if row.neighbor_id != paper_id]
+                if len(rows) >= self.k:
+                    weakest = min(rows, key=lambda row: row.score)
+                    if score <= weakest.score:
+                        if existing is not None:
+                            db.delete(existing)
+                        continue
+                    db.delete(weakest)
+                if existing is not None:
+                    existing.score = score
+                else:
+                    db.add(PaperNeighbor(paper_id=other, neighbor_id=paper_id, score=score))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def referrers(self, db, paper_id: int) -> List[int]:
+        """列表中含有指定論文的論文 id（刪除前查詢）"""
+        return [
+            other for other, in
+            db.query(PaperNeighbor.paper_id).filter(PaperNeighbor.neighbor_id == paper_id)
+        ]
+
+    def recompute(self, paper_ids: Iterable[int]):
+        """重新計算指定論文的相似列表"""
+        db = SessionLocal()
+        try:
+            for paper_id in paper_ids:
+                self._replace(db, paper_id, self.compute(paper_id))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"重新計算相似論文時發生錯誤: {str(e)}", exc_info=True)
+        finally:
+            db.close()
+
+    def get(self, db, paper_id: int, k: int = None) -> List[Tuple[int, float]]:
+        """讀取已保存的相似列表（空列表表示尚未計算過，可再呼叫 backfill）"""
+        k = min(k or self.k, self.k)
+        rows = (
+            db.query(PaperNeighbor.neighbor_id, PaperNeighbor.score)
+            .filter(PaperNeighbor.paper_id == paper_id)
+            .order_by(PaperNeighbor.score.desc())
+            .limit(k)
+            .all()
+        )
+        return [(neighbor_id, score) for neighbor_id, score in rows]
+
+    def backfill(self, paper_id: int, k: int = None) -> List[Tuple[int, float]]:
+        """即時計算尚未保存的相似列表並保存，回傳前 k 筆"""
+        neighbors = self.compute(paper_id)
+        if neighbors:
+            self.recompute([paper_id])
+        return neighbors[:min(k or self.k, self.k)]
+
+
+similar_papers = SimilarPapers()
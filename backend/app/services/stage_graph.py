@@ -0,0 +1,69 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+@dataclass
+class Stage:
+    """處理階段：fn 接收其依賴階段的結果（以名稱為鍵）"""
+    fn: Callable[[Dict[str, Any]], Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+
+
+def _check_acyclic(stages: Dict[str, Stage]):
+    visiting, done = set(), set()
+
+    def visit(name: str):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"處理階段存在循環依賴: {name}")
+        if name not in stages:
+            raise ValueError(f"未定義的處理階段: {name}")
+        visiting.add(name)
+        for dep in stages[name].deps:
+            visit(dep)
+        visiting.remove(name)
+        done.add(name)
+
+    for name in stages:
+        visit(name)
+
+
+async def run_stage_graph(
+    stages: Dict[str, Stage],
+    max_concurrency: int,
+    on_complete: Optional[Callable[[str, int, int], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """依依賴關係並行執行各階段，同時執行的階段數不超過 max_concurrency
+
+    任一階段失敗時會取消其餘階段並拋出該例外。
+    on_complete(name, completed, total) 在每個階段完成後呼叫。
+    """
+    _check_acyclic(stages)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results: Dict[str, Any] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(name: str):
+        stage = stages[name]
+        if stage.deps:
+            await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+        async with semaphore:
+            result = await stage.fn({dep: results[dep] for dep in stage.deps})
+        results[name] = result
+        if on_complete:
+            await on_complete(name, len(results), len(stages))
+        return result
+
+    for name in stages:
+        tasks[name] = asyncio.create_task(run(name))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return results
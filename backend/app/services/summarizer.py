@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_CJK_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+
+# 章節標題：編號標題（1 / 2.3 / IV.）或常見章節名稱，單獨成行
+_HEADING_RE = re.compile(
+    r'^[ \t]*(?:'
+    r'(?:\d{1,2}(?:\.\d{1,2})*|[IVX]{1,5})\.?[ \t]+[A-Z][^\n]{0,80}'
+    r'|(?:abstract|introduction|related work|background|preliminaries|method(?:s|ology)?|approach'
+    r'|experiments?|evaluation|results|discussion|conclusions?|acknowledg(?:e)?ments?'
+    r'|references|bibliography|摘要|緒論|結論|參考文獻)[ \t]*:?'
+    r')[ \t]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+_REFERENCES_RE = re.compile(r'^(?:references|bibliography|參考文獻)$', re.IGNORECASE)
+
+CHUNK_SYSTEM_PROMPT = (
+    "You are summarising one part of a longer academic paper. Write concise English notes "
+    "covering the problem, methods, key results and contributions that appear in this part. "
+    "Do not invent content that is not in the text."
+)
+COLLAPSE_SYSTEM_PROMPT = (
+    "You are merging notes taken from consecutive parts of an academic paper. Combine them into "
+    "one concise set of English notes without losing key methods, results or contributions."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """粗估 token 數：CJK 字元約 1 token，其餘約 4 字元 1 token"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """依章節標題切分全文，並去除參考文獻之後的內容，回傳 (標題, 內容) 列表"""
+    matches = list(_HEADING_RE.finditer(text))
+    # 參考文獻通常位於後半部，避免誤判目錄中的標題
+    for match in reversed(matches):
+        if _REFERENCES_RE.match(match.group().strip().rstrip(':')) and match.start() > len(text) * 0.3:
+            text = text[:match.start()]
+            matches = [m for m in matches if m.start() < match.start()]
+            break
+
+    sections = []
+    if not matches or matches[0].start() > 0:
+        sections.append(("", text[:matches[0].start()] if matches else text))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections.append((match.group().strip(), text[match.end():end]))
+    return [(title, body) for title, body in sections if body.strip() or title]
+
+
+def _split_oversized(text: str, budget: int) -> List[str]:
+    """將超過預算的章節依段落切分，段落仍過長時依字元數硬切"""
+    pieces, current = [], ""
+    for paragraph in re.split(r'\n\s*\n|\n', text):
+        candidate = f"{current}\n{paragraph}" if current else paragraph
+        if estimate_tokens(candidate) <= budget:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        while estimate_tokens(paragraph) > budget:
+            # 依字元/token 比例估計切分位置，並盡量在空白處切斷
+            cut = max(1, len(paragraph) * budget // estimate_tokens(paragraph))
+            space = paragraph.rfind(" ", cut // 2, cut)
+            cut = space if space > 0 else cut
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        current = paragraph
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def truncate_notes(notes: List[str], budget: int) -> List[str]:
+    """筆記總量超過 budget tokens 時，依比例截短每則筆記（保留每個部分的開頭）"""
+    total = estimate_tokens("\n\n".join(notes))
+    if total <= budget:
+        return notes
+    # 每則筆記的預算扣除分隔符與估計誤差
+    per_note = max(1, budget // len(notes) - 2)
+    return [
+        note if estimate_tokens(note) <= per_note else note[:len(note) * per_note // estimate_tokens(note)]
+        for note in notes
+    ]
+
+
+def chunk_text(text: str, budget: int) -> List[str]:
+    """依章節組合不超過 budget tokens 的文本分塊，盡量不跨章節切斷"""
+    chunks, current = [], ""
+    for title, body in split_sections(text):
+        section = f"{title}\n{body}".strip()
+        if estimate_tokens(section) > budget:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_oversized(section, budget))
+            continue
+        candidate = f"{current}\n\n{section}" if current else section
+        if estimate_tokens(candidate) <= budget:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = section
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+class MapReduceSummarizer:
+    """長文件的 map-reduce 摘要
+
+    map：將全文依章節切成符合 token 預算的分塊，以有限並行度各自摘要成筆記；
+    collapse：筆記總量超過 reduce 預算時分組合併，直到可放入單次 reduce 呼叫；
+    無法再合併時截短筆記，回傳的筆記總量一律不超過 reduce 預算。
+    最終的 reduce（英文摘要、中文摘要）由呼叫端以筆記作為輸入進行。
+    """
+
+    def __init__(
+        self,
+        llm,
+        model: str = "gpt-3.5-turbo",
+        chunk_tokens: int = settings.SUMMARY_CHUNK_TOKENS,
+        reduce_tokens: int = settings.SUMMARY_REDUCE_TOKENS,
+        note_tokens: int = settings.SUMMARY_NOTE_TOKENS,
+        max_concurrency: int = settings.SUMMARY_MAP_CONCURRENCY,
+    ):
+        self.llm = llm
+        self.model = model
+        self.chunk_tokens = chunk_tokens
+        self.reduce_tokens = reduce_tokens
+        self.note_tokens = note_tokens
+        self.max_concurrency = max_concurrency
+
+    def fits(self, text: str) -> bool:
+        return estimate_tokens(text) <= self.chunk_tokens
+
+    async def _summarize_all(self, system_prompt: str, parts: List[str]) -> List[str]:
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def summarize(part: str) -> str:
+            async with semaphore:
+                return await self.llm.complete(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": part}
+                    ],
+                    temperature=0,
+                    max_tokens=self.note_tokens
+                )
+
+        return list(await asyncio.gather(*(summarize(part) for part in parts)))
+
+    async def digest(self, text: str) -> Optional[List[str]]:
+        """產生各分塊的摘要筆記；全文可直接放入單次呼叫時回傳 None"""
+        if self.fits(text):
+            return None
+
+        chunks = chunk_text(text, self.chunk_tokens)
+        logger.info(f"長文件分為 {len(chunks)} 個分塊進行摘要")
+        notes = await self._summarize_all(CHUNK_SYSTEM_PROMPT, chunks)
+
+        while estimate_tokens("\n\n".join(notes)) > self.reduce_tokens and len(notes) > 1:
+            groups = chunk_text("\n\n".join(notes), self.reduce_tokens)
+            if len(groups) >= len(notes):
+                # 無法再合併（每則筆記都超過預算的一半）
+                break
+            notes = await self._summarize_all(COLLAPSE_SYSTEM_PROMPT, groups)
+
+        if estimate_tokens("\n\n".join(notes)) > self.reduce_tokens:
+            logger.warning(f"合併後的筆記仍超過 reduce 預算 {self.reduce_tokens} tokens，截短筆記")
+            notes = truncate_notes(notes, self.reduce_tokens)
+        return notes
+
+    @staticmethod
+    def format_notes(notes: List[str]) -> str:
+        return "\n\n".join(f"[Part {i + 1}]\n{note}" for i, note in enumerate(notes))
@@ -0,0 +1,52 @@
+import re
+import unicodedata
+from typing import Iterator, List, Tuple
+
+# 全文搜尋的分析器：建立索引與查詢時使用相同的斷詞規則，
+# PostgreSQL 後端也以此結果建立 tsvector（'simple' 設定不再另行處理）
+
+_CJK = r'\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+# 中日文字元連續段落與其他文字的詞彙分開處理（例如 "BERT模型" 拆為 "BERT" 與 "模型"）
+_TOKEN_RE = re.compile(rf'(?P<cjk>[{_CJK}]+)|(?P<word>[^\W_{_CJK}]+)')
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that the their
+there these this to was were which with we our can not no such than then they been using
+""".split())
+
+
+def _normalize(token: str) -> str:
+    # 全形英數字轉半形、統一大小寫（逐詞處理，不影響原文位置）
+    return unicodedata.normalize("NFKC", token).lower()
+
+
+def iter_tokens(text: str, query: bool = False) -> Iterator[Tuple[str, int, int]]:
+    """依序產生 (詞彙, 起始位置, 結束位置)
+
+    英文等以空白分詞的文字轉為小寫並去除停用詞；中日文沒有詞界，連續段落
+    切成字元 bigram。建立索引時另外輸出單字元詞彙，讓單字查詢也能命中；
+    查詢時段落長度超過一個字元則只使用 bigram，減少需合併的倒排列表。
+    """
+    for match in _TOKEN_RE.finditer(text or ""):
+        start = match.start()
+        if match.group("word") is not None:
+            token = _normalize(match.group())
+            if token not in STOP_WORDS:
+                yield token, start, match.end()
+            continue
+
+        run = _normalize(match.group())
+        if len(run) != match.end() - start:
+            # 正規化改變長度時無法對應原文位置，整段視為一個詞彙
+            yield run, start, match.end()
+            continue
+        for i, char in enumerate(run):
+            if not query or len(run) == 1:
+                yield char, start + i, start + i + 1
+            if i + 1 < len(run):
+                yield run[i:i + 2], start + i, start + i + 2
+
+
+def analyze(text: str, query: bool = False) -> List[str]:
+    """將文本轉為索引詞彙列表；query=True 時使用查詢端的規則"""
+    return [token for token, _, _ in iter_tokens(text, query)]
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+from docx import Document
+
+logger = logging.getLogger(__name__)
+
+# 本模組的頂層函式會在子進程中執行，請保持匯入輕量（不載入模型或資料庫）
+
+def pdf_page_count(file_path: str) -> int:
+    with fitz.open(file_path) as doc:
+        return doc.page_count
+
+
+def extract_pdf_pages(file_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+    """提取 PDF 第 start 至 end-1 頁的文本，每頁一個字串"""
+    with fitz.open(file_path) as doc:
+        end = doc.page_count if end is None else min(end, doc.page_count)
+        return [doc.load_page(i).get_text() for i in range(start, end)]
+
+
+def _layout_title(page) -> Optional[str]:
+    """依版面找出標題：頁面上半部字體明顯大於內文的文字
+
+    內文字體取該頁字元數最多的字體大小；沒有明顯較大的字體時回傳 None。
+    """
+    spans = [
+        (round(span["size"], 1), span["bbox"][1], span["bbox"][0], span["text"].strip())
+        for block in page.get_text("dict")["blocks"] if block.get("type") == 0
+        for line in block["lines"]
+        for span in line["spans"]
+        if span["text"].strip()
+    ]
+    if not spans:
+        return None
+    characters: Counter = Counter()
+    for size, _, _, text in spans:
+        characters[size] += len(text)
+    body_size = characters.most_common(1)[0][0]
+    upper = [span for span in spans if span[1] < page.rect.height / 2 and len(span[3]) > 1]
+    if not upper:
+        return None
+    title_size = max(size for size, _, _, _ in upper)
+    if title_size < body_size * 1.15:
+        return None
+    parts = sorted((y, x, text) for size, y, x, text in upper if size >= title_size - 0.5)
+    return " ".join(text for _, _, text in parts)[:500] or None
+
+
+def pdf_front_matter(file_path: str) -> Dict[str, Optional[str]]:
+    """第一頁版面標題（layout_title）與 PDF 內嵌的 title / author 資訊"""
+    with fitz.open(file_path) as doc:
+        info = doc.metadata or {}
+        return {
+            "layout_title": _layout_title(doc.load_page(0)) if doc.page_count else None,
+            "title": (info.get("title") or "").strip() or None,
+            "author": (info.get("author") or "").strip() or None,
+        }
+
+
+def extract_docx_paragraphs(file_path: str) -> List[str]:
+    """提取 DOCX 各段落文本（含換行）"""
+    doc = Document(file_path)
+    return [paragraph.text + "\n" for paragraph in doc.paragraphs]
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """取得文本提取用的進程池（使用 spawn，避免 fork 帶入執行緒與模型狀態）"""
+    global _pool
+    if _pool is None:
+        from ..core.config import settings
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def extract_pages(file_path: str) -> List[str]:
+    """在進程池中提取文件文本，不阻塞事件迴圈
+
+    PDF 超過 PDF_PAGES_PER_SHARD 頁時依頁碼區間切分，各區間並行解析後依序合併；
+    DOCX 沒有分頁資訊，整份文件視為單頁。
+    """
+    from ..core.config import settings
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    file_ext = os.path.splitext(file_path)[1].lower()
+
+    if file_ext == '.pdf':
+        page_count = await loop.run_in_executor(pool, pdf_page_count, file_path)
+        shard = max(1, settings.PDF_PAGES_PER_SHARD)
+        shards = await asyncio.gather(*(
+            loop.run_in_executor(pool, extract_pdf_pages, file_path, start, start + shard)
+            for start in range(0, page_count, shard)
+        ))
+        return [page for pages in shards for page in pages]
+    elif file_ext == '.docx':
+        paragraphs = await loop.run_in_executor(pool, extract_docx_paragraphs, file_path)
+        return ["".join(paragraphs)]
+    else:
+        raise ValueError(f"不支援的文件類型: {file_ext}")
+
+
+async def extract_text(file_path: str) -> str:
+    """在進程池中提取文件全文"""
+    logger.info(f"正在提取文本: {file_path}")
+    text = "".join(await extract_pages(file_path))
+    logger.info("文本提取完成")
+    return text
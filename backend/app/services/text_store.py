@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import zlib
+from typing import List, Optional
+
+from ..db.session import SessionLocal
+from ..models.document_text import DocumentText
+from . import text_extraction
+
+logger = logging.getLogger(__name__)
+
+
+class StoredText:
+    """解壓後的全文與分頁位置"""
+
+    def __init__(self, text: str, page_offsets: List[int]):
+        self.text = text
+        self.page_offsets = page_offsets
+
+    @classmethod
+    def from_pages(cls, pages: List[str]) -> "StoredText":
+        offsets, position = [], 0
+        for page in pages:
+            offsets.append(position)
+            position += len(page)
+        return cls("".join(pages), offsets)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_offsets)
+
+    def page(self, index: int) -> str:
+        """取得第 index 頁（從 0 開始）的文本"""
+        start = self.page_offsets[index]
+        end = self.page_offsets[index + 1] if index + 1 < self.page_count else len(self.text)
+        return self.text[start:end]
+
+
+def load_text(content_hash: str) -> Optional[StoredText]:
+    """依內容雜湊讀取已保存的全文，不存在時回傳 None"""
+    db = SessionLocal()
+    try:
+        entry = db.query(DocumentText).filter(DocumentText.content_hash == content_hash).first()
+        if entry is None:
+            return None
+        text = zlib.decompress(entry.compressed_text).decode("utf-8")
+        return StoredText(text, entry.page_offsets or [0])
+    finally:
+        db.close()
+
+
+def save_text(content_hash: str, stored: StoredText):
+    """壓縮並保存全文，已存在時不覆寫"""
+    db = SessionLocal()
+    try:
+        if db.query(DocumentText.content_hash).filter(DocumentText.content_hash == content_hash).first():
+            return
+        db.add(DocumentText(
+            content_hash=content_hash,
+            compressed_text=zlib.compress(stored.text.encode("utf-8"), 6),
+            page_offsets=stored.page_offsets,
+            char_count=len(stored.text),
+        ))
+        db.commit()
+    except Exception as e:
+        # 並發寫入同一雜湊時可能違反主鍵約束，內容相同可忽略
+        db.rollback()
+        logger.warning(f"保存全文時發生錯誤: {str(e)}")
+    finally:
+        db.close()
+
+
+async def get_or_extract(file_path: str, content_hash: Optional[str]) -> StoredText:
+    """優先讀取已保存的全文，否則解析文件並保存，後續重新處理不需再次解析"""
+    if content_hash:
+        stored = await asyncio.to_thread(load_text, content_hash)
+        if stored is not None:
+            logger.info(f"使用已保存的全文: {content_hash}")
+            return stored
+
+    stored = StoredText.from_pages(await text_extraction.extract_pages(file_path))
+    if content_hash and stored.text:
+        await asyncio.to_thread(save_text, content_hash, stored)
+    return stored
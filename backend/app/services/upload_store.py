@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from typing import BinaryIO, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def content_path(content_hash: str, ext: str) -> str:
+    """內容定址的儲存路徑：UPLOAD_FOLDER/<hash 前兩碼>/<hash><副檔名>"""
+    return os.path.join(settings.UPLOAD_FOLDER, content_hash[:2], f"{content_hash}{ext.lower()}")
+
+
+def _sync_and_close(buffer):
+    buffer.flush()
+    os.fsync(buffer.fileno())
+    buffer.close()
+
+
+def _move(tmp_path: str, file_path: str):
+    """以原子性 rename 移至最終路徑"""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    os.replace(tmp_path, file_path)
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def save_stream(
+    stream: BinaryIO,
+    filename: str,
+    max_size: int = settings.MAX_CONTENT_LENGTH,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+) -> Tuple[str, str]:
+    """save_upload 的同步版本，用於壓縮檔成員等檔案物件，超過大小時拋出 UploadTooLarge"""
+    ext = os.path.splitext(filename or "")[1]
+    sha256 = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=settings.UPLOAD_FOLDER, suffix=".part")
+    buffer = os.fdopen(fd, "wb")
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(f"文件大小超過上限 {max_size // (1024 * 1024)}MB")
+            sha256.update(chunk)
+            buffer.write(chunk)
+
+        content_hash = sha256.hexdigest()
+        file_path = content_path(content_hash, ext)
+        _sync_and_close(buffer)
+        _move(tmp_path, file_path)
+        return file_path, content_hash
+    except BaseException:
+        buffer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_size: int = settings.MAX_CONTENT_LENGTH,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+) -> Tuple[str, str]:
+    """以固定大小分塊串流寫入暫存檔，邊寫入邊計算 SHA-256
+
+    每次只在記憶體中保留一個分塊；累計大小超過 max_size 時立即中止並回傳 413。
+    回傳 (暫存檔路徑, content_hash)，暫存檔由呼叫端負責移動或刪除。
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=settings.UPLOAD_FOLDER, suffix=".part")
+    buffer = os.fdopen(fd, "wb")
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"文件大小超過上限 {max_size // (1024 * 1024)}MB"
+                )
+            sha256.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+
+        await asyncio.to_thread(_sync_and_close, buffer)
+        return tmp_path, sha256.hexdigest()
+    except BaseException:
+        buffer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+async def save_upload(
+    file: UploadFile,
+    max_size: int = settings.MAX_CONTENT_LENGTH,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+) -> Tuple[str, str]:
+    """串流保存上傳文件，並以內容雜湊作為檔名原子性地移至最終路徑
+
+    相同內容的文件會得到相同路徑，不同內容的同名文件不會互相覆蓋。
+    回傳 (file_path, content_hash)。
+    """
+    tmp_path, content_hash = await spool_upload(file, max_size, chunk_size)
+    file_path = content_path(content_hash, os.path.splitext(file.filename or "")[1])
+    try:
+        await asyncio.to_thread(_move, tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return file_path, content_hash
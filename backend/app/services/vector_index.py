@@ -0,0 +1,263 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """以記憶體映射 float32 矩陣保存的向量索引，支援增量追加與 IVF 近似搜尋
+
+    檔案結構（皆為 append-only，可被多個進程以 mmap 共用）：
+      vectors.f32  每列一個已正規化的向量
+      assign.i32   每列所屬的 IVF 分群（訓練後才有）
+      ids.i64      每列對應的擁有者 id（論文 id），刪除時改為 -1
+      centroids.npy / meta.json  IVF 分群中心與訓練資訊
+
+    向量數少於 min_train 時使用精確搜尋；達到後以 spherical k-means 訓練
+    分群中心，查詢只比對最接近的 nprobe 個分群。資料量成長為訓練時的
+    retrain_factor 倍時重新訓練。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int,
+        min_train: int = 4096,
+        nprobe: int = 8,
+        retrain_factor: float = 4.0,
+    ):
+        self.directory = directory
+        self.dim = dim
+        self.min_train = min_train
+        self.nprobe = nprobe
+        self.retrain_factor = retrain_factor
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._assign_path = os.path.join(directory, "assign.i32")
+        self._ids_path = os.path.join(directory, "ids.i64")
+        self._centroids_path = os.path.join(directory, "centroids.npy")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._lock = threading.RLock()
+
+        self._count = 0
+        self._version = None
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._order: Optional[np.ndarray] = None
+        self._bounds: Optional[np.ndarray] = None
+
+    @contextmanager
+    def _file_lock(self):
+        """跨進程寫入鎖"""
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _rows_on_disk(self) -> int:
+        if not os.path.exists(self._ids_path):
+            return 0
+        return os.path.getsize(self._ids_path) // 8
+
+    def _meta(self) -> dict:
+        if not os.path.exists(self._meta_path):
+            return {}
+        with open(self._meta_path) as f:
+            return json.load(f)
+
+    def _refresh(self):
+        """檔案有變動時（本進程或其他進程寫入）重新映射"""
+        count = self._rows_on_disk()
+        version = self._meta().get("version")
+        if count == self._count and version == self._version and (count == 0 or self._vectors is not None):
+            return
+
+        self._count = count
+        self._version = version
+        if count == 0:
+            self._vectors = self._ids = self._centroids = self._order = self._bounds = None
+            return
+
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        self._ids = np.memmap(self._ids_path, dtype=np.int64, mode="r", shape=(count,))
+        if version is not None and os.path.exists(self._centroids_path):
+            self._centroids = np.load(self._centroids_path)
+            assign = np.memmap(self._assign_path, dtype=np.int32, mode="r", shape=(count,))
+            self._order = np.argsort(assign, kind="stable")
+            self._bounds = np.searchsorted(assign[self._order], np.arange(len(self._centroids) + 1))
+        else:
+            self._centroids = self._order = self._bounds = None
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._count
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, owner_id: int, vectors: np.ndarray):
+        """追加一個擁有者的向量（可多列，例如標題摘要與各段落）"""
+        vectors = self.normalize(vectors)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"向量維度應為 {self.dim}，實際為 {vectors.shape[1]}")
+        with self._lock, self._file_lock():
+            self._refresh()
+            # 寫入順序：向量 -> 分群 -> id，讀取端以 id 檔大小決定有效列數
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            if self._centroids is not None:
+                assign = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+                with open(self._assign_path, "ab") as f:
+                    f.write(assign.tobytes())
+            with open(self._ids_path, "ab") as f:
+                f.write(np.full(len(vectors), owner_id, dtype=np.int64).tobytes())
+            self._refresh()
+            self._maybe_train()
+
+    def remove(self, owner_id: int) -> int:
+        """將擁有者的向量標記為刪除，回傳影響的列數"""
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._count == 0:
+                return 0
+            ids = np.memmap(self._ids_path, dtype=np.int64, mode="r+", shape=(self._count,))
+            mask = ids == owner_id
+            removed = int(mask.sum())
+            if removed:
+                ids[mask] = -1
+                ids.flush()
+            del ids
+            return removed
+
+    def vectors_of(self, owner_id: int) -> np.ndarray:
+        """取得擁有者的所有向量（依寫入順序），不存在時回傳空矩陣"""
+        with self._lock:
+            self._refresh()
+            if self._count == 0:
+                return np.empty((0, self.dim), dtype=np.float32)
+            rows = np.flatnonzero(np.asarray(self._ids) == owner_id)
+            return np.asarray(self._vectors[rows])
+
+    def _maybe_train(self):
+        trained = self._meta().get("trained_rows", 0)
+        if self._count < self.min_train:
+            return
+        if trained and self._count < trained * self.retrain_factor:
+            return
+        self._train()
+
+    def _train(self, iterations: int = 10, sample_size: int = 50000):
+        """以 spherical k-means 訓練 IVF 分群中心並重寫所有列的分群"""
+        count = self._count
+        nlist = int(min(1024, max(8, np.sqrt(count))))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(count, size=min(sample_size, count), replace=False))
+        sample = np.asarray(self._vectors[sample_rows])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = self.normalize(sums)
+
+        assign = np.empty(count, dtype=np.int32)
+        for start in range(0, count, 65536):
+            block = np.asarray(self._vectors[start:start + 65536])
+            assign[start:start + 65536] = np.argmax(block @ centroids.T, axis=1)
+
+        tmp_assign = self._assign_path + ".tmp"
+        assign.tofile(tmp_assign)
+        os.replace(tmp_assign, self._assign_path)
+        np.save(self._centroids_path + ".tmp.npy", centroids)
+        os.replace(self._centroids_path + ".tmp.npy", self._centroids_path)
+        meta = self._meta()
+        meta.update({"trained_rows": count, "nlist": nlist, "version": meta.get("version", 0) + 1})
+        with open(self._meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(self._meta_path + ".tmp", self._meta_path)
+        logger.info(f"向量索引 IVF 訓練完成：{count} 列，{nlist} 個分群")
+        self._refresh()
+
+    def _candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        if self._centroids is None:
+            return None
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self._order[self._bounds[c]:self._bounds[c + 1]] for c in probes])
+
+    def search(self, query: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """回傳相似度最高的 k 個擁有者 (owner_id, score)，同一擁有者只取最高分的列"""
+        query = self.normalize(query)[0]
+        with self._lock:
+            self._refresh()
+            if self._count == 0:
+                return []
+            vectors, ids = self._vectors, self._ids
+            rows = self._candidates(query)
+
+        if rows is None:
+            scores = vectors @ query
+            owners = np.asarray(ids)
+        else:
+            rows = np.sort(rows)
+            scores = np.asarray(vectors[rows]) @ query
+            owners = np.asarray(ids[rows])
+
+        valid = owners >= 0
+        scores, owners = scores[valid], owners[valid]
+        if len(scores) == 0:
+            return []
+
+        # 先取較多候選再去重，不足時退回完整排序
+        take = min(len(scores), k * 8)
+        top = np.argpartition(-scores, take - 1)[:take]
+        results = self._unique_top(scores, owners, top, k)
+        if len(results) < k and take < len(scores):
+            results = self._unique_top(scores, owners, np.arange(len(scores)), k)
+        return results
+
+    @staticmethod
+    def _unique_top(scores, owners, candidates, k) -> List[Tuple[int, float]]:
+        seen, results = set(), []
+        for i in candidates[np.argsort(-scores[candidates])]:
+            owner = int(owners[i])
+            if owner in seen:
+                continue
+            seen.add(owner)
+            results.append((owner, float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+    def reset(self):
+        """清空索引（重建前使用）"""
+        with self._lock, self._file_lock():
+            for path in (self._vectors_path, self._assign_path, self._ids_path,
+                         self._centroids_path, self._meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._count = 0
+            self._version = None
+            self._vectors = self._ids = self._centroids = self._order = self._bounds = None
@@ -1,5 +1,5 @@
 import React from 'react';
-import { useParams } from 'react-router-dom';
+import { Link, useParams } from 'react-router-dom';
 import { useQuery } from '@tanstack/react-query';
 import { paperService, type Paper } from '../services/paperService';
 import { Spinner } from '../components/Spinner';
@@ -20,6 +20,12 @@ const PaperDetail: React.FC = () => {
 
   console.log('Query state:', { isLoading, error, paper });
 
+  const { data: similarPapers } = useQuery({
+    queryKey: ['paper', id, 'similar'],
+    queryFn: () => paperService.getSimilarPapers(Number(id)),
+    enabled: !!paper,
+  });
+
   if (isLoading) {
     return <Spinner />;
   }
@@ -118,6 +124,23 @@ const PaperDetail: React.FC = () => {
           ))}
         </div>
       </div>
+      {similarPapers && similarPapers.length > 0 && (
+        <div style={{ marginBottom: 18 }}>
+          <h2 style={{ fontSize: 20, fontWeight: 700, color: '#0ff', marginBottom: 6 }}>相關論文</h2>
+          <ul style={{ listStyle: 'none', padding: 0, margin: 0 }}>
+            {similarPapers.map((similar) => (
+              <li key={similar.id} style={{ marginBottom: 8 }}>
+                <Link to={`/papers/${similar.id}`} style={{ color: '#fff', fontWeight: 500 }}>
+                  {similar.title}
+                </Link>
+                <span style={{ color: '#aaa', marginLeft: 8, fontSize: 13 }}>
+                  {similar.year ? `${similar.year}　|　` : ''}相似度 {similar.score.toFixed(2)}
+                </span>
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
     </div>
   );
 };
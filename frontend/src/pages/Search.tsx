@@ -14,12 +14,13 @@ import {
   Chip,
 } from '@mui/material';
 import { Search as SearchIcon } from '@mui/icons-material';
-import type { Paper as PaperType } from '../services/api';
+import type { SearchHit } from '../services/api';
 import { paperService } from '../services/api';
 
 const Search = () => {
   const [query, setQuery] = useState('');
-  const [results, setResults] = useState<PaperType[]>([]);
+  const [results, setResults] = useState<SearchHit[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -34,7 +35,26 @@ const Search = () => {
 
     try {
       const data = await paperService.searchPapers(query);
-      setResults(data);
+      setResults(data.items);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      setError('搜索失敗，請稍後重試');
+      console.error('Search error:', err);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleLoadMore = async () => {
+    if (!nextCursor) {
+      return;
+    }
+
+    setLoading(true);
+    try {
+      const data = await paperService.searchPapers(query, nextCursor);
+      setResults((current) => [...current, ...data.items]);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       setError('搜索失敗，請稍後重試');
       console.error('Search error:', err);
@@ -103,12 +123,22 @@ const Search = () => {
                             <Typography variant="body2" color="text.secondary">
                               作者：{paper.authors.join(', ')}
                             </Typography>
-                            <Typography variant="body2" color="text.secondary" sx={{ mt: 0.5 }}>
-                              摘要：{paper.abstract}
-                            </Typography>
+                            {paper.snippet ? (
+                              <Typography
+                                variant="body2"
+                                color="text.secondary"
+                                sx={{ mt: 0.5 }}
+                                // 片段已由後端跳脫，只保留 <mark> 標示
+                                dangerouslySetInnerHTML={{ __html: paper.snippet }}
+                              />
+                            ) : (
+                              <Typography variant="body2" color="text.secondary" sx={{ mt: 0.5 }}>
+                                摘要：{paper.abstract}
+                              </Typography>
+                            )}
                             <Box sx={{ mt: 1, display: 'flex', flexWrap: 'wrap', gap: 1 }}>
                               {paper.keywords?.map((keyword) => (
-                                <Chip key={keyword.id} label={keyword.word} size="small" />
+                                <Chip key={keyword} label={keyword} size="small" />
                               ))}
                             </Box>
                           </Box>
@@ -119,6 +149,13 @@ const Search = () => {
                   </div>
                 ))}
               </List>
+              {nextCursor && (
+                <Box sx={{ mt: 2, textAlign: 'center' }}>
+                  <Button variant="outlined" onClick={handleLoadMore} disabled={loading}>
+                    載入更多
+                  </Button>
+                </Box>
+              )}
             </Box>
           )}
 
@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useMutation } from '@tanstack/react-query';
-import { paperService } from '../services/api';
+import { paperService, IngestJob } from '../services/api';
 import { FiUpload } from 'react-icons/fi';
 import { Box, Paper, Typography, Button } from '@mui/material';
 
@@ -9,6 +9,7 @@ const Upload: React.FC = () => {
   const navigate = useNavigate();
   const [errorMessage, setErrorMessage] = useState<string | null>(null);
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
+  const [job, setJob] = useState<IngestJob | null>(null);
 
   const handleDrop = (event: React.DragEvent<HTMLDivElement>) => {
     event.preventDefault();
@@ -26,12 +27,14 @@ const Upload: React.FC = () => {
 
   const uploadMutation = useMutation({
     mutationFn: async (file: File) => {
-      return paperService.uploadPaper(file);
+      const queued = await paperService.uploadPaper(file);
+      setJob(queued);
+      return paperService.waitForIngestJob(queued.id, setJob);
     },
     onSuccess: (data) => {
       navigate('/', { 
         state: { 
-          newPaperId: data.id 
+          newPaperId: data.paper_id 
         } 
       });
     },
@@ -116,6 +119,11 @@ const Upload: React.FC = () => {
             {uploadMutation.isPending ? '上傳中...' : '開始上傳'}
           </Button>
         </Box>
+        {uploadMutation.isPending && job && (
+          <Typography sx={{ mt: 2 }} variant="body2" color="text.secondary">
+            處理中：{job.stage}（{job.progress}%）
+          </Typography>
+        )}
         {errorMessage && (
           <Typography variant="body2" color="error" sx={{ mt: 2 }}>
             {errorMessage}
@@ -142,12 +142,43 @@ export interface PaperResponse {
   figures: Figure[];
 }
 
+export interface SearchHit {
+  id: number;
+  title: string;
+  authors: string[];
+  journal: string | null;
+  year: number | null;
+  abstract: string | null;
+  created_at: string;
+  summary: string | null;
+  keywords: string[];
+  score: number;
+  snippet: string | null;
+}
+
+export interface SearchPage {
+  items: SearchHit[];
+  next_cursor: string | null;
+}
+
+export interface IngestJob {
+  id: number;
+  filename: string;
+  status: 'pending' | 'running' | 'done' | 'failed';
+  stage: string;
+  progress: number;
+  error: string | null;
+  paper_id: number | null;
+  created_at: string;
+  updated_at: string;
+}
+
 export const paperService = {
   // 獲取所有論文
   getAllPapers: async () => {
     try {
-      const response = await api.get<Paper[]>('/papers/');
-      return response.data;
+      const response = await api.get<{ items: Paper[] }>('/papers/');
+      return response.data.items;
     } catch (error) {
       console.error('Error fetching papers:', error);
       throw error;
@@ -166,14 +197,14 @@ export const paperService = {
   },
 
   // 上傳新論文
-  uploadPaper: async (file: File, onProgress?: (progress: number) => void): Promise<Paper> => {
+  uploadPaper: async (file: File, onProgress?: (progress: number) => void): Promise<IngestJob> => {
     try {
       const formData = new FormData();
       formData.append('file', file);
       
       console.log('Uploading file:', file.name, 'Size:', file.size, 'Type:', file.type);
       
-      const response = await api.post<Paper>('/papers/upload', formData, {
+      const response = await api.post<IngestJob>('/papers/upload', formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
@@ -204,10 +235,52 @@ export const paperService = {
     }
   },
 
-  // 搜索論文
-  searchPapers: async (query: string) => {
+  // 查詢論文處理工作狀態
+  getIngestJob: async (id: number): Promise<IngestJob> => {
     try {
-      const response = await api.get<Paper[]>(`/papers/search?query=${encodeURIComponent(query)}`);
+      const response = await api.get<IngestJob>(`/papers/jobs/${id}`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching ingest job ${id}:`, error);
+      throw error;
+    }
+  },
+
+  // 等待論文處理工作完成
+  waitForIngestJob: async (
+    id: number,
+    onJobUpdate?: (job: IngestJob) => void,
+    interval = 2000
+  ): Promise<IngestJob> => {
+    for (;;) {
+      const job = await paperService.getIngestJob(id);
+      if (onJobUpdate) {
+        onJobUpdate(job);
+      }
+      if (job.status === 'done') {
+        return job;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || '論文處理失敗');
+      }
+      await new Promise((resolve) => setTimeout(resolve, interval));
+    }
+  },
+
+  // 搜索論文：預設同時進行全文與語意搜索並融合排序，以游標分頁
+  searchPapers: async (
+    query: string,
+    cursor?: string | null,
+    mode: 'lexical' | 'semantic' | 'hybrid' = 'hybrid'
+  ): Promise<SearchPage> => {
+    try {
+      const response = await api.get<SearchPage>('/papers/search/fulltext', {
+        params: { q: query, mode, ...(cursor ? { cursor } : {}) },
+      });
+      const timing = response.headers['server-timing'];
+      if (timing) {
+        console.log('Search timing:', timing);
+      }
       return response.data;
     } catch (error) {
       console.error('Error searching papers:', error);
@@ -218,8 +291,8 @@ export const paperService = {
   // 獲取論文列表
   listPapers: async (): Promise<PaperList[]> => {
     try {
-      const response = await api.get<PaperList[]>('/papers');
-      return response.data;
+      const response = await api.get<{ items: PaperList[] }>('/papers');
+      return response.data.items;
     } catch (error) {
       console.error('Error fetching papers:', error);
       throw error;
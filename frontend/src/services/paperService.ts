@@ -17,10 +17,15 @@ export interface Paper {
   created_at?: string;
 }
 
+export interface SimilarPaper extends Paper {
+  score: number;
+}
+
 export const paperService = {
+  // 列表以游標分頁，回傳第一頁（最新上傳的論文）
   async getAllPapers(): Promise<Paper[]> {
     const response = await axios.get(`${API_URL}/papers`);
-    return response.data;
+    return response.data.items;
   },
 
   async getPaper(id: number): Promise<Paper> {
@@ -28,6 +33,11 @@ export const paperService = {
     return response.data;
   },
 
+  async getSimilarPapers(id: number): Promise<SimilarPaper[]> {
+    const response = await axios.get(`${API_URL}/papers/${id}/similar`);
+    return response.data;
+  },
+
   async uploadPaper(file: File) {
     const formData = new FormData();
     formData.append('file', file);
@@ -48,7 +58,7 @@ export const paperService = {
 
   async listPapers(): Promise<Paper[]> {
     const response = await axios.get(`${API_URL}/papers/`);
-    return response.data;
+    return response.data.items;
   },
 
   async deletePaper(id: number): Promise<void> {
@@ -0,0 +1,75 @@
+import asyncio
+import os
+
+# 設定在匯入應用程式前需要存在（測試不會呼叫 OpenAI）
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.app.db.base_class import Base
+from backend.app.models.paper import Paper, Topic, Keyword, Summary, Author
+from backend.app.models.user import User
+from backend.app.models.login_attempt import LoginAttempt
+from backend.app.models.ingest_job import IngestJob
+from backend.app.models.llm_cache import LLMCacheEntry
+from backend.app.models.document_text import DocumentText
+from backend.app.models.paper_neighbor import PaperNeighbor
+from backend.app.models.term_stat import TermStat
+
+PAPER_COUNT = 60
+
+
+class QueryCounter:
+    """以 before_cursor_execute 計算送出的 SQL 語句數"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+
+async def _seed(session_factory):
+    async with session_factory() as db:
+        uploader = User(username="uploader", password_hash="x", name="Uploader")
+        topic = Topic(name="topic")
+        keywords = [Keyword(word=f"keyword {index}") for index in range(3)]
+        db.add_all([uploader, topic, *keywords])
+        for index in range(PAPER_COUNT):
+            db.add(Paper(
+                title=f"Paper {index}",
+                authors=[f"Author {index}"],
+                journal="Journal",
+                year=2024,
+                abstract=f"Abstract {index}",
+                uploader=uploader,
+                topic=topic,
+                keywords=keywords,
+                summary=Summary(content=f"摘要 {index}"),
+            ))
+        await db.commit()
+
+
+@pytest.fixture
+def database(tmp_path):
+    """已建立資料表並寫入 PAPER_COUNT 篇論文（含主題、摘要、關鍵字與上傳者）的 SQLite 資料庫
+
+    回傳 (session_factory, QueryCounter)。
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await _seed(session_factory)
+
+    asyncio.run(setup())
+    yield session_factory, QueryCounter(engine)
+    asyncio.run(engine.dispose())
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db.base_class import Base
+from backend.app.models.ingest_job import IngestJob
+from backend.app.models.paper import Paper
+from backend.app.services import ingest_queue as ingest_queue_module
+from backend.app.services.ingest_queue import IngestQueue
+
+PAPER_DATA = {
+    "title": "Queued Paper",
+    "authors": [],
+    "journal": "",
+    "year": "2024",
+    "abstract": "Abstract",
+    "summary": {"content": "摘要", "language": "zh-TW"},
+    "keywords": [],
+}
+
+
+class SlowProcessor:
+    """處理時間超過 stale_after 的 PaperProcessor 替身"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.calls = 0
+
+    async def process_paper(self, file_path, on_stage=None, content_hash=None):
+        self.calls += 1
+        await on_stage("metadata", 10)
+        await asyncio.sleep(self.seconds)
+        return PAPER_DATA
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(ingest_queue_module, "SessionLocal", factory)
+    for index in (ingest_queue_module.search_index, ingest_queue_module.semantic_search):
+        monkeypatch.setattr(index, "index_paper", lambda paper_id: None)
+    monkeypatch.setattr(ingest_queue_module.keyword_extractor, "add_papers", lambda paper_ids: len(paper_ids))
+    yield factory
+    engine.dispose()
+
+
+def _enqueue(queue, session_factory) -> int:
+    with session_factory() as db:
+        return queue.enqueue(db, "paper.pdf", "paper.pdf", content_hash="a" * 64).id
+
+
+def _job(session_factory, job_id):
+    with session_factory() as db:
+        return db.get(IngestJob, job_id)
+
+
+def test_long_running_job_is_not_reclaimed(session_factory):
+    queue = IngestQueue(workers=1, stale_after=0.5, heartbeat_interval=0.1)
+    queue._processor = SlowProcessor(1.5)
+    job_id = _enqueue(queue, session_factory)
+
+    async def scenario():
+        assert await asyncio.to_thread(queue._claim) == job_id
+        run = asyncio.create_task(queue._run(job_id))
+        await asyncio.sleep(1.0)
+        # 單一階段已超過 stale_after，心跳讓工作仍不可被其他 worker 領取
+        reclaimed = await asyncio.to_thread(queue._claim)
+        await run
+        return reclaimed
+
+    assert asyncio.run(scenario()) is None
+    assert queue._processor.calls == 1
+    assert _job(session_factory, job_id).status == "done"
+
+
+def test_index_failure_after_save_keeps_job_done(session_factory, monkeypatch):
+    def fail(paper_id):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(ingest_queue_module.search_index, "index_paper", fail)
+    queue = IngestQueue(workers=1, stale_after=600, heartbeat_interval=60)
+    queue._processor = SlowProcessor(0)
+    job_id = _enqueue(queue, session_factory)
+
+    async def scenario():
+        await asyncio.to_thread(queue._claim)
+        await queue._run(job_id)
+
+    asyncio.run(scenario())
+    job = _job(session_factory, job_id)
+    assert job.status == "done"
+    with session_factory() as db:
+        assert db.get(Paper, job.paper_id).year == 2024
@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db.base_class import Base
+from backend.app.models.llm_cache import LLMCacheEntry
+from backend.app.services import llm_cache
+from backend.app.services.llm_cache import CacheStats, CachedLLMClient
+
+
+class FakeOpenAI:
+    """依序回傳 response-0、response-1 ... 的 chat completion 客戶端"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        content = f"response-{self.calls}"
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_cache_evicts_periodically_and_counts_hits(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine, tables=[LLMCacheEntry.__table__])
+    session_factory = sessionmaker(bind=engine)
+    stats = CacheStats()
+    monkeypatch.setattr(llm_cache, "SessionLocal", session_factory)
+    monkeypatch.setattr(llm_cache, "llm_cache_stats", stats)
+
+    client = CachedLLMClient(FakeOpenAI(), enabled=True, ttl_seconds=3600, max_entries=2, evict_every=3)
+
+    def entries():
+        with session_factory() as db:
+            return db.query(LLMCacheEntry).count()
+
+    async def ask(text):
+        return await client.complete(model="gpt", messages=[{"role": "user", "content": text}])
+
+    for index in range(2):
+        asyncio.run(ask(f"q{index}"))
+    # 未到清理週期，不執行淘汰
+    assert entries() == 2
+    asyncio.run(ask("q2"))
+    # 第 3 次寫入時淘汰到 max_entries
+    assert entries() == 2
+    asyncio.run(ask("q3"))
+    assert entries() == 3
+
+    assert asyncio.run(ask("q3")) == "response-3"
+    assert stats.stats() == {"hits": 1, "misses": 4, "hit_rate": 0.2}
+    assert client.stats() == stats.stats()
@@ -0,0 +1,36 @@
+from backend.app.core.config import settings
+from backend.app.services.metadata_parser import local_metadata, overall_confidence, parse_front_matter
+
+HEADER = """Attention Is All You Need
+
+Ashish Vaswani, Noam Shazeer, Niki Parmar
+Google Brain
+Microsoft Corporation Redmond
+Stanford NLP
+Mountain View, CA 94043
+avaswani@google.com
+
+Abstract
+The dominant sequence transduction models are based on complex recurrent networks.
+
+1 Introduction
+"""
+
+
+def test_affiliation_lines_are_not_authors():
+    metadata = parse_front_matter(HEADER)
+    assert metadata["title"] == "Attention Is All You Need"
+    assert metadata["authors"] == ["Ashish Vaswani", "Noam Shazeer", "Niki Parmar"]
+
+
+def test_unconfirmed_authors_escalate_to_llm():
+    metadata, confidence = local_metadata(HEADER, {"layout_title": "Attention Is All You Need"})
+    assert confidence["authors"] < settings.METADATA_CONFIDENCE_THRESHOLD
+    assert overall_confidence(confidence) < settings.METADATA_CONFIDENCE_THRESHOLD
+
+
+def test_embedded_author_confirms_authors():
+    _, confidence = local_metadata(
+        HEADER, {"layout_title": "Attention Is All You Need", "author": "Ashish Vaswani; Noam Shazeer"}
+    )
+    assert confidence["authors"] >= settings.METADATA_CONFIDENCE_THRESHOLD
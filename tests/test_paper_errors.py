@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from backend.app.api.api_v1.endpoints.papers import list_papers, search_papers
+
+
+def _status(database, call):
+    session_factory, _ = database
+
+    async def run():
+        async with session_factory() as db:
+            await call(db)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+    return error.value.status_code
+
+
+def test_rejects_bad_parameters(database):
+    assert _status(database, lambda db: list_papers(limit=5, cursor="not-a-cursor", fields=None, db=db)) == 400
+    assert _status(database, lambda db: list_papers(limit=5, cursor=None, fields="title,unknown", db=db)) == 400
+    assert _status(database, lambda db: search_papers(
+        keyword="keyword", topic=None, author=None, limit=5, cursor="not-a-cursor", fields=None, db=db
+    )) == 400
+
+
+def test_reports_bad_rows_as_server_errors(database):
+    session_factory, _ = database
+
+    async def corrupt():
+        async with session_factory() as db:
+            await db.execute(text("UPDATE papers SET year = 'unknown'"))
+            await db.commit()
+
+    asyncio.run(corrupt())
+    assert _status(database, lambda db: list_papers(limit=5, cursor=None, fields="title,year", db=db)) == 500
+    assert _status(database, lambda db: search_papers(
+        keyword="keyword", topic=None, author=None, limit=5, cursor=None, fields="title,year", db=db
+    )) == 500
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from backend.app.api.api_v1.endpoints.papers import _load_papers, _scored_papers, get_paper, list_papers, search_papers
+from backend.app.models.paper import Paper
+from backend.app.schemas.paper import SemanticSearchResult
+
+# 列表與搜尋每頁的查詢數（論文、關鍵字、總數估計）不隨每頁筆數增加
+MAX_QUERIES = 3
+PAGE_SIZES = (5, 50)
+RELATION_FIELDS = "title,topic,summary,keywords,uploader_name"
+
+
+def _count_queries(database, call):
+    """以新的 session 執行 call(db)，回傳 (結果, 查詢數)"""
+    session_factory, counter = database
+
+    async def run():
+        async with session_factory() as db:
+            counter.reset()
+            result = await call(db)
+            return result, counter.count
+
+    return asyncio.run(run())
+
+
+def _assert_flat(database, call):
+    counts = {}
+    for limit in PAGE_SIZES:
+        page, counts[limit] = _count_queries(database, lambda db: call(db, limit))
+        assert len(page.items) == limit
+        assert page.next_cursor
+    assert len(set(counts.values())) == 1, counts
+    assert counts[PAGE_SIZES[0]] <= MAX_QUERIES, counts
+
+
+@pytest.mark.parametrize("fields", [None, RELATION_FIELDS])
+def test_list_papers_query_count_is_flat(database, fields):
+    _assert_flat(database, lambda db, limit: list_papers(limit=limit, cursor=None, fields=fields, db=db))
+
+
+@pytest.mark.parametrize("fields", [None, RELATION_FIELDS])
+def test_search_papers_query_count_is_flat(database, fields):
+    _assert_flat(database, lambda db, limit: search_papers(
+        keyword="keyword", topic="topic", author=None, limit=limit, cursor=None, fields=fields, db=db
+    ))
+
+
+def test_load_papers_query_count_is_flat(database):
+    session_factory, _ = database
+
+    async def paper_ids():
+        async with session_factory() as db:
+            return list((await db.execute(select(Paper.id).order_by(Paper.id))).scalars())
+
+    ids = asyncio.run(paper_ids())
+    counts = {}
+    for limit in PAGE_SIZES:
+        hits = [(paper_id, 1.0) for paper_id in ids[:limit]]
+
+        async def load(db):
+            # 組成回應時存取所有關聯，延遲載入會出現在查詢數中（或在非同步 session 中失敗）
+            return _scored_papers(await _load_papers(db, hits), hits, SemanticSearchResult)
+
+        items, counts[limit] = _count_queries(database, load)
+        assert len(items) == limit
+        assert all(item.keywords and item.summary and item.uploader_name for item in items)
+    assert len(set(counts.values())) == 1, counts
+    assert counts[PAGE_SIZES[0]] <= MAX_QUERIES, counts
+
+
+def test_get_paper_loads_relations_without_full_text(database):
+    paper, count = _count_queries(database, lambda db: get_paper(paper_id=1, db=db))
+    assert paper.topic and paper.summary and paper.keywords and paper.uploader_name
+    # 全文由 /{paper_id}/text 提供，不讀取 papers.content
+    assert paper.content is None
+    assert count <= 2
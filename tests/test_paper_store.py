@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from backend.app.api.api_v1.endpoints.papers import list_papers
+from backend.app.services.metadata_parser import parse_front_matter
+from backend.app.services.paper_store import create_paper, normalize_year
+
+NO_YEAR_PAPER = """A Paper Without a Publication Year
+
+Alice Chen, Bob Wang
+
+Abstract
+We describe a method.
+"""
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2017", 2017), (2017, 2017), ("2017a", 2017), ("May 2017", 2017),
+    ("", None), (None, None), ("n.d.", None), ("12345", None),
+])
+def test_normalize_year(value, expected):
+    assert normalize_year(value) == expected
+
+
+def test_paper_without_year_is_stored_as_null(database):
+    session_factory, _ = database
+    metadata = parse_front_matter(NO_YEAR_PAPER)
+    assert metadata["year"] == ""
+    paper_data = {
+        "title": metadata["title"],
+        "authors": [],
+        "journal": metadata["journal"],
+        "year": metadata["year"],
+        "abstract": "We describe a method.",
+        "summary": {"content": "摘要", "language": "zh-TW"},
+        "keywords": [],
+    }
+
+    async def run():
+        async with session_factory() as db:
+            paper = await db.run_sync(create_paper, paper_data, "paper.pdf")
+            await db.commit()
+            paper_id = paper.id
+        async with session_factory() as db:
+            page = await list_papers(limit=200, cursor=None, fields="title,year", db=db)
+        return paper_id, page
+
+    paper_id, page = asyncio.run(run())
+    item = next(item for item in page.items if item.id == paper_id)
+    assert item.title == "A Paper Without a Publication Year"
+    assert item.year is None
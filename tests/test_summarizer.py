@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from backend.app.services.summarizer import MapReduceSummarizer, estimate_tokens, truncate_notes
+
+
+class VerboseLLM:
+    """每次呼叫都回傳固定長度筆記的 LLM 替身（合併無法縮短筆記）"""
+
+    def __init__(self, note_tokens: int):
+        self.note = "note " * note_tokens
+        self.calls = 0
+
+    async def complete(self, model, messages, **params):
+        self.calls += 1
+        return self.note
+
+
+@pytest.mark.parametrize("note_tokens", [120, 400])
+def test_digest_stays_within_reduce_budget_when_collapse_cannot_shrink(note_tokens):
+    summarizer = MapReduceSummarizer(
+        VerboseLLM(note_tokens), chunk_tokens=100, reduce_tokens=150, note_tokens=note_tokens, max_concurrency=2
+    )
+    text = "\n\n".join(f"{index} Section\n" + "word " * 300 for index in range(1, 5))
+
+    notes = asyncio.run(summarizer.digest(text))
+
+    assert notes
+    assert estimate_tokens("\n\n".join(notes)) <= summarizer.reduce_tokens
+
+
+def test_truncate_notes_keeps_notes_within_budget():
+    notes = ["short", "long " * 500]
+    assert truncate_notes(notes, 1000) == notes
+    truncated = truncate_notes(notes, 100)
+    assert truncated[0] == "short"
+    assert estimate_tokens("\n\n".join(truncated)) <= 100